@@ -314,10 +314,10 @@ context = {"x": 10, "y": 20, "z": 30}
 """
     
     expressions = [
-        ("2 + 3", "Simple arithmetic"),
-        ("x + y", "Variable access"),
-        ("abs(x) + round(y, 2)", "Function calls"),
-        ("x + y * z / 2", "Complex expression"),
+        ("engine.evaluate('2 + 3', context)", "Simple arithmetic"),
+        ("engine.evaluate('x + y', context)", "Variable access"),
+        ("engine.evaluate('abs(x) + round(y, 2)', context)", "Function calls"),
+        ("engine.evaluate('x + y * z / 2', context)", "Complex expression"),
         ("evaluate('x + y', context)", "Convenience function"),
     ]
     
@@ -345,6 +345,8 @@ def recommendations():
     print("\n2. Use compiled expressions for hot paths:")
     print("   compiled = CompiledExpression.compile(expr)")
     print("   result = compiled.evaluate(context)")
+    print("   # Batch workloads: evaluate many contexts in one call")
+    print("   results = compiled.evaluate_many(contexts)")
     
     print("\n3. Minimize context lookups:")
     print("   # Bad: multiple lookups")
@@ -7,38 +7,99 @@ from qdata_expr import (
     Sandbox,
     SandboxConfig,
     SecurityViolationError,
+    TemplateEngine,
     get_expression_safety_issues,
     is_expression_safe,
     validate_expression_safety,
 )
+from qdata_expr.parser import parse_cached
+
+# 所有示例共享同一组引擎实例，引擎内部的编译缓存可以跨示例复用
+_ENGINE = ExpressionEngine()
+_STRICT_ENGINE = ExpressionEngine(sandbox_config=SandboxConfig(strict_private_access=True))
+_TEMPLATE_ENGINE = TemplateEngine()
+
+# 示例中使用的表达式都是固定的常量，提升到模块级以便统一预解析
+SAFE_EXPRESSIONS = [
+    "2 + 3 * 4",
+    "abs(-5) + round(3.14, 2)",
+    "max(1, 2, 3) * min(4, 5, 6)",
+    "'hello' + ' ' + 'world'",
+    "len([1, 2, 3])",
+    "sum([1, 2, 3, 4, 5])",
+    "True and False or True",
+    "5 > 3 and 10 < 20",
+    "{'a': 1, 'b': 2}['a'] + 10",
+    "[x**2 for x in range(5)]",
+]
+
+UNSAFE_EXPRESSIONS = [
+    "eval('1+1')",
+    "exec('print(\"hacked\")')",
+    "__import__('os').system('echo hacked')",
+    "open('/etc/passwd').read()",
+    "globals()['__builtins__']['eval']('1+1')",
+    "getattr(object, '__class__')",
+    "compile('print(\"hacked\")', '', 'exec')",
+    "import os",
+    "from os import system",
+    "type(1)",
+    "vars(object)",
+    "dir()",
+    "locals()",
+    "sys._getframe()",
+    "object.__subclasses__()",
+]
+
+SAFETY_ISSUE_EXPRESSIONS = [
+    "eval('1+1')",
+    "__import__('os')",
+    "getattr(object, '__class__')",
+    "open('/etc/passwd')",
+]
+
+IS_SAFE_CASES = [
+    ("2 + 3", True),
+    ("abs(-5)", True),
+    ("'hello'.upper()", True),
+    ("eval('1+1')", False),
+    ("exec('print()')", False),
+    ("open('file.txt')", False),
+    ("__import__('os')", False),
+]
+
+
+def _warm_parse_cache():
+    """Parse every example expression once into the shared AST cache.
+
+    The engine, the sandbox and the validation helpers all reuse
+    ``parse_cached``, so later examples no longer pay for parsing.
+    """
+    expressions = [
+        *SAFE_EXPRESSIONS,
+        *UNSAFE_EXPRESSIONS,
+        *SAFETY_ISSUE_EXPRESSIONS,
+        *(expr for expr, _ in IS_SAFE_CASES),
+    ]
+    for expr in expressions:
+        try:
+            parse_cached(expr)
+        except SyntaxError:
+            # 语句（如 import）不是合法表达式，由引擎在运行时报告
+            pass
 
 
 def safe_expressions():
     """Examples of safe expressions."""
     print("=== Safe Expressions ===")
     
-    engine = ExpressionEngine()
-    
     # 这些表达式都是安全的
-    safe_exprs = [
-        "2 + 3 * 4",
-        "abs(-5) + round(3.14, 2)",
-        "max(1, 2, 3) * min(4, 5, 6)",
-        "'hello' + ' ' + 'world'",
-        "len([1, 2, 3])",
-        "sum([1, 2, 3, 4, 5])",
-        "True and False or True",
-        "5 > 3 and 10 < 20",
-        "{'a': 1, 'b': 2}['a'] + 10",
-        "[x**2 for x in range(5)]",
-    ]
-    
-    for expr in safe_exprs:
-        try:
-            result = engine.evaluate(expr)
+    results = _ENGINE.evaluate_many(SAFE_EXPRESSIONS, return_exceptions=True)
+    for expr, result in zip(SAFE_EXPRESSIONS, results, strict=True):
+        if isinstance(result, Exception):
+            print(f"✗ {expr} -> Error: {result}")
+        else:
             print(f"✓ {expr} = {result}")
-        except Exception as e:
-            print(f"✗ {expr} -> Error: {e}")
     
     print()
 
@@ -47,35 +108,15 @@ def unsafe_expressions():
     """Examples of unsafe expressions that should be blocked."""
     print("=== Unsafe Expressions (Blocked) ===")
     
-    engine = ExpressionEngine()
-    
     # 这些表达式是不安全的，应该被阻止
-    unsafe_exprs = [
-        "eval('1+1')",
-        "exec('print(\"hacked\")')",
-        "__import__('os').system('echo hacked')",
-        "open('/etc/passwd').read()",
-        "globals()['__builtins__']['eval']('1+1')",
-        "getattr(object, '__class__')",
-        "compile('print(\"hacked\")', '', 'exec')",
-        "import os",
-        "from os import system",
-        "type(1)",
-        "vars(object)",
-        "dir()",
-        "locals()",
-        "sys._getframe()",
-        "object.__subclasses__()",
-    ]
-    
-    for expr in unsafe_exprs:
-        try:
-            result = engine.evaluate(expr)
+    results = _ENGINE.evaluate_many(UNSAFE_EXPRESSIONS, return_exceptions=True)
+    for expr, result in zip(UNSAFE_EXPRESSIONS, results, strict=True):
+        if isinstance(result, SecurityViolationError):
+            print(f"✓ {expr} -> Blocked: {result}")
+        elif isinstance(result, Exception):
+            print(f"✓ {expr} -> Blocked: {type(result).__name__}: {result}")
+        else:
             print(f"⚠ {expr} = {result} (Should have been blocked!)")
-        except SecurityViolationError as e:
-            print(f"✓ {expr} -> Blocked: {e}")
-        except Exception as e:
-            print(f"✓ {expr} -> Blocked: {type(e).__name__}: {e}")
     
     print()
 
@@ -154,14 +195,7 @@ def safety_issues():
     print("=== Safety Issues Analysis ===")
     
     # 获取详细的安全问题
-    expressions = [
-        "eval('1+1')",
-        "__import__('os')",
-        "getattr(object, '__class__')",
-        "open('/etc/passwd')",
-    ]
-    
-    for expr in expressions:
+    for expr in SAFETY_ISSUE_EXPRESSIONS:
         issues = get_expression_safety_issues(expr)
         print(f"Expression: {expr}")
         if issues:
@@ -176,17 +210,7 @@ def is_safe_function():
     """Using is_expression_safe function."""
     print("=== is_expression_safe Function ===")
     
-    test_cases = [
-        ("2 + 3", True),
-        ("abs(-5)", True),
-        ("'hello'.upper()", True),
-        ("eval('1+1')", False),
-        ("exec('print()')", False),
-        ("open('file.txt')", False),
-        ("__import__('os')", False),
-    ]
-    
-    for expr, expected in test_cases:
+    for expr, expected in IS_SAFE_CASES:
         result = is_expression_safe(expr)
         status = "✓" if result == expected else "✗"
         print(f"{status} {expr} -> {result} (expected {expected})")
@@ -198,14 +222,8 @@ def private_attribute_access():
     """Private attribute access examples."""
     print("=== Private Attribute Access ===")
     
-    # 默认配置（允许私有属性访问）
-    engine_default = ExpressionEngine()
-    
-    # 严格配置（阻止私有属性访问）
-    strict_config = SandboxConfig(strict_private_access=True)
-    engine_strict = ExpressionEngine(
-        sandbox_config=strict_config
-    )
+    # 默认配置（允许私有属性访问）: _ENGINE
+    # 严格配置（阻止私有属性访问）: _STRICT_ENGINE
     
     # 测试私有属性访问
     test_cases = [
@@ -217,7 +235,7 @@ def private_attribute_access():
     print("Default engine:")
     for expr in test_cases:
         try:
-            result = engine_default.evaluate(expr, {"obj": object()})
+            result = _ENGINE.evaluate(expr, {"obj": object()})
             print(f"  {expr} -> {result}")
         except Exception as e:
             print(f"  {expr} -> {type(e).__name__}: {e}")
@@ -225,7 +243,7 @@ def private_attribute_access():
     print("\nStrict engine:")
     for expr in test_cases:
         try:
-            result = engine_strict.evaluate(expr, {"obj": object()})
+            result = _STRICT_ENGINE.evaluate(expr, {"obj": object()})
             print(f"  {expr} -> {result}")
         except Exception as e:
             print(f"  {expr} -> {type(e).__name__}: {e}")
@@ -299,8 +317,6 @@ def template_security():
     """Template security examples."""
     print("=== Template Security ===")
     
-    engine = TemplateEngine()
-    
     # 安全的模板
     safe_templates = [
         "Hello, {{ name }}!",
@@ -308,10 +324,11 @@ def template_security():
         "{% if user.age >= 18 %}Adult{% else %}Minor{% endif %}",
     ]
     
+    context = {"name": "Alice", "price": 100, "quantity": 2, "user": {"age": 25}}
     print("Safe templates:")
     for template in safe_templates:
         try:
-            result = engine.render(template, {"name": "Alice", "price": 100, "quantity": 2, "user": {"age": 25}})
+            result = _TEMPLATE_ENGINE.render(template, context)
             print(f"  ✓ {template} -> {result}")
         except Exception as e:
             print(f"  ✗ {template} -> {e}")
@@ -357,6 +374,7 @@ def best_practices():
 
 def main():
     """Run all security examples."""
+    _warm_parse_cache()
     safe_expressions()
     unsafe_expressions()
     sandbox_configuration()
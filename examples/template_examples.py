@@ -2,14 +2,18 @@
 Template engine usage examples for qdata-expression.
 """
 
-from qdata_expr import TemplateEngine, render_template
+from qdata_expr import TemplateEngine, get_default_template_engine, render_template
+
+# 与 render_template 共享默认引擎，已编译的模板在各示例之间复用
+# （注册自定义过滤器的示例仍使用独立引擎，避免影响其他示例）
+_ENGINE = get_default_template_engine()
 
 
 def basic_template_rendering():
     """Basic template rendering examples."""
     print("=== Basic Template Rendering ===")
     
-    engine = TemplateEngine()
+    engine = _ENGINE
     
     # 简单变量替换
     template = "Hello, {{ name }}!"
@@ -43,7 +47,7 @@ def conditional_templates():
     """Conditional template examples."""
     print("=== Conditional Templates ===")
     
-    engine = TemplateEngine()
+    engine = _ENGINE
     
     # 简单条件
     template = """
@@ -92,7 +96,7 @@ def loop_templates():
     """Loop template examples."""
     print("=== Loop Templates ===")
     
-    engine = TemplateEngine()
+    engine = _ENGINE
     
     # 简单循环
     template = """
@@ -142,7 +146,7 @@ def filters():
     """Filter examples."""
     print("=== Filters ===")
     
-    engine = TemplateEngine()
+    engine = _ENGINE
     
     # 大小写转换
     template = "{{ name | upper }}"
@@ -188,7 +192,7 @@ def filter_chaining():
     """Filter chaining examples."""
     print("=== Filter Chaining ===")
     
-    engine = TemplateEngine()
+    engine = _ENGINE
     
     # 多个过滤器
     template = "{{ name | trim | upper }}"
@@ -249,7 +253,7 @@ def nested_loops():
     """Nested loop examples."""
     print("=== Nested Loops ===")
     
-    engine = TemplateEngine()
+    engine = _ENGINE
     
     # 嵌套循环
     template = """
@@ -285,7 +289,7 @@ def arithmetic_in_templates():
     """Arithmetic operations in templates."""
     print("=== Arithmetic in Templates ===")
     
-    engine = TemplateEngine()
+    engine = _ENGINE
     
     # 基本算术
     template = "Total: {{ price * quantity }}"
@@ -325,7 +329,7 @@ def template_validation():
     """Template validation examples."""
     print("=== Template Validation ===")
     
-    engine = TemplateEngine()
+    engine = _ENGINE
     
     # 验证有效模板
     template = "Hello, {{ name }}!"
@@ -3,15 +3,21 @@
 批量添加许可声明到源代码文件
 
 用法:
-    python scripts/add_license_headers.py [--dry-run] [--force]
+    python scripts/add_license_headers.py [--dry-run] [--force] [--jobs N]
 
 选项:
     --dry-run  只显示将要修改的文件，不实际修改
     --force    强制覆盖已有的许可声明
+    --jobs N   并行进程数（默认使用 CPU 核数）
 """
 
 import argparse
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import os
 from pathlib import Path
+import re
 import sys
 
 # 标准许可声明模板
@@ -34,20 +40,35 @@ LICENSE_HEADER_FULL = '''# Copyright (c) 2024-2026 广东轻亿云软件科技
 '''
 
 # 核心模块使用完整模板
-CORE_MODULES = ['evaluator.py', 'parser.py', 'sandbox.py', 'context.py', 'template.py']
+CORE_MODULES = frozenset({'evaluator.py', 'parser.py', 'sandbox.py', 'context.py', 'template.py'})
+
+# 文件名 -> 许可声明（未列出的文件使用标准模板）
+_HEADER_FOR = dict.fromkeys(CORE_MODULES, LICENSE_HEADER_FULL)
+
+# 需要跳过的特殊目录
+SKIP_DIRS = frozenset({'__pycache__', '.venv', 'venv', 'build', 'dist'})
+
+# 许可声明检测范围（字符数）
+HEADER_SCAN_LIMIT = 1000
+
+# 检测时预读的字节数（UTF-8 每字符最多 4 字节，保证覆盖检测范围）
+HEADER_PREFIX_BYTES = HEADER_SCAN_LIMIT * 4
+
+# 在文件开头一次扫描同时确认 Copyright 与许可证标识（两者顺序不限）
+_HEADER_RE = re.compile(r'(?=[\s\S]*?Copyright)(?=[\s\S]*?(?:AGPL|MIT))')
+
+# 文件开头连续的注释行和空行（强制模式下视为旧的许可声明）
+_LEADING_COMMENTS_RE = re.compile(r'(?:[^\S\n]*(?:#[^\n]*)?\n)+')
 
 
 def has_license_header(content: str) -> bool:
     """检查是否已有许可声明"""
-    first_lines = content[:1000]
-    return 'Copyright' in first_lines and ('AGPL' in first_lines or 'MIT' in first_lines)
+    return _HEADER_RE.match(content, 0, HEADER_SCAN_LIMIT) is not None
 
 
 def get_license_header(file_path: Path) -> str:
     """根据文件类型获取合适的许可声明"""
-    if file_path.name in CORE_MODULES:
-        return LICENSE_HEADER_FULL
-    return LICENSE_HEADER_STANDARD
+    return _HEADER_FOR.get(file_path.name, LICENSE_HEADER_STANDARD)
 
 
 def add_license_header(file_path: Path, dry_run: bool = False, force: bool = False) -> bool:
@@ -56,47 +77,54 @@ def add_license_header(file_path: Path, dry_run: bool = False, force: bool = Fal
     Returns:
         True if file was modified (or would be in dry-run mode)
     """
+    # 先只读取文件开头判断是否已有许可声明，避免读取整个文件
     try:
-        content = file_path.read_text(encoding='utf-8')
+        with file_path.open('rb') as f:
+            prefix = f.read(HEADER_PREFIX_BYTES).decode('utf-8', errors='ignore')
     except Exception as e:
         print(f"❌ 无法读取文件 {file_path}: {e}")
         return False
     
     # 检查是否已有许可声明
-    if has_license_header(content) and not force:
+    if has_license_header(prefix) and not force:
         print(f"⏭️  跳过（已有许可声明）: {file_path}")
         return False
     
+    try:
+        content = file_path.read_text(encoding='utf-8')
+    except Exception as e:
+        print(f"❌ 无法读取文件 {file_path}: {e}")
+        return False
+    
     # 获取合适的许可声明
     license_header = get_license_header(file_path)
     
-    # 处理文件内容
-    lines = content.split('\n')
-    
     # 如果是强制模式，移除旧的许可声明
     if force and has_license_header(content):
-        # 简单处理：跳过前面的注释行
-        start_idx = 0
-        for i, line in enumerate(lines):
-            if line.strip() and not line.strip().startswith('#'):
-                start_idx = i
-                break
-        lines = lines[start_idx:]
-        content = '\n'.join(lines)
-    
-    # 处理 shebang
-    if lines and lines[0].startswith('#!'):
-        new_content = lines[0] + '\n' + license_header + '\n'.join(lines[1:])
+        # 简单处理：跳过前面的注释行（文件中没有代码行时保持原样）
+        match = _LEADING_COMMENTS_RE.match(content)
+        if match:
+            first_line = content[match.end():].partition('\n')[0].strip()
+            if first_line and not first_line.startswith('#'):
+                content = content[match.end():]
+    
+    # 处理 shebang：只切分第一行，不拆分整个文件
+    if content.startswith('#!'):
+        shebang, _, content = content.partition('\n')
+        head = shebang + '\n'
     else:
-        new_content = license_header + content
+        head = ''
     
     if dry_run:
         print(f"🔍 将要修改: {file_path}")
         return True
     
-    # 写入文件
+    # 写入文件：分段写入，不在内存中拼接出完整的新内容
     try:
-        file_path.write_text(new_content, encoding='utf-8')
+        with file_path.open('w', encoding='utf-8') as f:
+            f.write(head)
+            f.write(license_header)
+            f.write(content)
         print(f"✅ 已添加许可声明: {file_path}")
         return True
     except Exception as e:
@@ -104,26 +132,43 @@ def add_license_header(file_path: Path, dry_run: bool = False, force: bool = Fal
         return False
 
 
-def process_directory(directory: Path, dry_run: bool = False, force: bool = False) -> tuple[int, int]:
+def iter_python_files(directory: Path) -> Iterator[Path]:
+    """遍历目录下的所有 Python 文件
+    
+    使用 os.walk 并原地裁剪特殊目录，不会进入 __pycache__、.venv 等子树，
+    也只为匹配的文件创建 Path 对象。
+    """
+    for dirpath, dirnames, filenames in os.walk(directory):
+        dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+        for filename in filenames:
+            if filename.endswith('.py'):
+                yield Path(dirpath, filename)
+
+
+def process_directory(
+    directory: Path, dry_run: bool = False, force: bool = False, jobs: int | None = None
+) -> tuple[int, int]:
     """处理目录中的所有 Python 文件
     
+    各文件相互独立，使用进程池并行处理。
+    
+    Args:
+        jobs: 并行进程数，None 表示使用 CPU 核数，1 表示串行处理
+    
     Returns:
         (modified_count, skipped_count)
     """
-    modified = 0
-    skipped = 0
+    files = list(iter_python_files(directory))
     
-    for py_file in directory.rglob('*.py'):
-        # 跳过特殊目录
-        if any(part in py_file.parts for part in ['__pycache__', '.venv', 'venv', 'build', 'dist']):
-            continue
-        
-        if add_license_header(py_file, dry_run, force):
-            modified += 1
-        else:
-            skipped += 1
+    process = partial(add_license_header, dry_run=dry_run, force=force)
+    if jobs == 1 or len(files) <= 1:
+        results = [process(py_file) for py_file in files]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(process, files, chunksize=16))
     
-    return modified, skipped
+    modified = sum(results)
+    return modified, len(results) - modified
 
 
 def main():
@@ -153,6 +198,12 @@ def main():
         action='store_true',
         help='强制覆盖已有的许可声明'
     )
+    parser.add_argument(
+        '--jobs', '-j',
+        type=int,
+        default=None,
+        help='并行进程数（默认使用 CPU 核数，1 表示串行）'
+    )
     
     args = parser.parse_args()
     
@@ -175,7 +226,7 @@ def main():
     print()
     
     # 处理文件
-    modified, skipped = process_directory(src_dir, args.dry_run, args.force)
+    modified, skipped = process_directory(src_dir, args.dry_run, args.force, args.jobs)
     
     print()
     print("=" * 60)
@@ -6,12 +6,20 @@
 """
 
 import argparse
+import os
 import re
 import subprocess
 import sys
+import tempfile
 from datetime import date
 from pathlib import Path
 
+# 版本号相关的正则表达式（模块加载时编译一次）
+_VERSION_RE = re.compile(r'__version__\s*=\s*["\']([^"\']+)["\']')
+# 第 1、2 个分组分别是版本号前后的内容（含引号），替换时保持原样
+_VERSION_ASSIGN_RE = re.compile(r'(__version__\s*=\s*["\'])[^"\']+(["\'])')
+_PYPROJECT_VERSION_RE = re.compile(r'(?m)(^version\s*=\s*["\'])[^"\']+(["\'])')
+
 
 class Colors:
     """终端颜色"""
@@ -46,27 +54,38 @@ def print_warning(msg: str) -> None:
     print(f"{Colors.WARNING}⚠ {msg}{Colors.ENDC}")
 
 
+# 项目根目录（模块加载时解析一次）
+_ROOT = Path(__file__).resolve().parent.parent
+
+
 def get_root_dir() -> Path:
     """获取项目根目录"""
-    return Path(__file__).parent.parent
+    return _ROOT
 
 
 def get_current_version() -> str:
     """获取当前版本号"""
     version_file = get_root_dir() / "src" / "qdata_expr" / "_version.py"
     content = version_file.read_text()
-    match = re.search(r'__version__\s*=\s*["\']([^"\']+)["\']', content)
+    match = _VERSION_RE.search(content)
     if not match:
         raise ValueError("无法找到版本号")
     return match.group(1)
 
 
 def parse_version(version: str) -> tuple[int, int, int]:
-    """解析版本号"""
-    match = re.match(r"^(\d+)\.(\d+)\.(\d+)", version)
-    if not match:
-        raise ValueError(f"无效的版本号格式: {version}")
-    return int(match.group(1)), int(match.group(2)), int(match.group(3))
+    """解析版本号
+
+    只取开头的 ``主.次.修订`` 三段数字，忽略其后的 ``rc1``、``-dev``、``+build`` 等后缀。
+    """
+    parts = version.split(".", 2)
+    if len(parts) == 3:
+        major, minor, rest = parts
+        # 修订号取第三段开头的连续数字
+        patch = rest[: len(rest) - len(rest.lstrip("0123456789"))]
+        if major.isdecimal() and minor.isdecimal() and patch:
+            return int(major), int(minor), int(patch)
+    raise ValueError(f"无效的版本号格式: {version}")
 
 
 def bump_version(current: str, part: str) -> str:
@@ -83,82 +102,113 @@ def bump_version(current: str, part: str) -> str:
         raise ValueError(f"无效的版本部分: {part}")
 
 
-def update_version_file(new_version: str) -> None:
-    """更新 _version.py 文件"""
-    version_file = get_root_dir() / "src" / "qdata_expr" / "_version.py"
-    content = version_file.read_text()
-
-    # 更新版本号
-    content = re.sub(
-        r'__version__\s*=\s*["\'][^"\']+["\']',
-        f'__version__ = "{new_version}"',
-        content,
-    )
-
-    version_file.write_text(content)
-    print_success(f"已更新 {version_file.relative_to(get_root_dir())}")
-
+def _sub_once(pattern: re.Pattern[str], new_version: str, content: str, name: str) -> str:
+    """只替换版本号字面量，并确认恰好匹配一处"""
+    content, count = pattern.subn(rf"\g<1>{new_version}\g<2>", content)
+    if count != 1:
+        raise ValueError(f"{name} 中应恰好有一处版本号，实际找到 {count} 处")
+    return content
 
-def update_pyproject_toml(new_version: str) -> None:
-    """更新 pyproject.toml 文件"""
-    pyproject_file = get_root_dir() / "pyproject.toml"
-    content = pyproject_file.read_text()
 
-    # 更新版本号
-    content = re.sub(
-        r'version\s*=\s*["\'][^"\']+["\']',
-        f'version = "{new_version}"',
-        content,
-        count=1,
-    )
-
-    pyproject_file.write_text(content)
-    print_success(f"已更新 {pyproject_file.relative_to(get_root_dir())}")
+def update_version_file(content: str, new_version: str) -> str:
+    """更新 _version.py 内容"""
+    return _sub_once(_VERSION_ASSIGN_RE, new_version, content, "_version.py")
 
 
-def update_changelog(new_version: str) -> None:
-    """更新 CHANGELOG.md"""
-    changelog_file = get_root_dir() / "CHANGELOG.md"
+def update_pyproject_toml(content: str, new_version: str) -> str:
+    """更新 pyproject.toml 内容"""
+    return _sub_once(_PYPROJECT_VERSION_RE, new_version, content, "pyproject.toml")
 
-    if not changelog_file.exists():
-        print_warning("CHANGELOG.md 不存在，跳过更新")
-        return
 
-    content = changelog_file.read_text()
+def update_changelog(content: str, new_version: str) -> str:
+    """更新 CHANGELOG.md 内容"""
     today = date.today().isoformat()
 
     # 在 ## [Unreleased] 后添加新版本
     new_section = f"\n## [{new_version}] - {today}\n\n### Added\n\n### Changed\n\n### Fixed\n\n"
 
     if "## [Unreleased]" in content:
-        content = content.replace("## [Unreleased]", f"## [Unreleased]\n{new_section}")
+        return content.replace("## [Unreleased]", f"## [Unreleased]\n{new_section}")
+
+    # 如果没有 Unreleased 部分，插入到第一个 ## 标题之前（没有标题时插入到文件开头）
+    # find 未找到时返回 -1，加 1 后恰好是文件开头
+    idx = 0 if content.startswith("## ") else content.find("\n## ") + 1
+    return f"{content[:idx]}{new_section}\n{content[idx:]}"
+
+
+def write_atomic(path: Path, content: str) -> None:
+    """原子地写入文件（先写临时文件，再替换）"""
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    tmp_path = Path(tmp_name)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+        # mkstemp 创建的文件权限为 0600，沿用原文件的权限
+        tmp_path.chmod(path.stat().st_mode & 0o777)
+        tmp_path.replace(path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def update_files(new_version: str) -> None:
+    """更新所有包含版本号的文件
+
+    先读取全部文件并在内存中完成修改，全部成功后才写回磁盘，
+    避免部分文件更新失败时仓库处于半更新状态。
+    """
+    root = get_root_dir()
+    # (相对路径, 更新函数)；相对路径直接用于输出，无需再计算
+    updates = [
+        ("src/qdata_expr/_version.py", update_version_file),
+        ("pyproject.toml", update_pyproject_toml),
+    ]
+
+    has_changelog = (root / "CHANGELOG.md").exists()
+    if has_changelog:
+        updates.append(("CHANGELOG.md", update_changelog))
     else:
-        # 如果没有 Unreleased 部分，在文件开头添加
-        lines = content.split("\n")
-        # 找到第一个 ## 标题的位置
-        insert_idx = 0
-        for i, line in enumerate(lines):
-            if line.startswith("## "):
-                insert_idx = i
-                break
+        print_warning("CHANGELOG.md 不存在，跳过更新")
+
+    new_contents = []
+    for rel, update in updates:
+        path = root / rel
+        new_contents.append((rel, path, update(path.read_text(encoding="utf-8"), new_version)))
 
-        lines.insert(insert_idx, new_section)
-        content = "\n".join(lines)
+    for rel, path, content in new_contents:
+        write_atomic(path, content)
+        print_success(f"已更新 {rel}")
 
-    changelog_file.write_text(content)
-    print_success(f"已更新 {changelog_file.relative_to(get_root_dir())}")
-    print_warning(f"请手动编辑 CHANGELOG.md 添加版本更新内容")
+    if has_changelog:
+        print_warning("请手动编辑 CHANGELOG.md 添加版本更新内容")
 
 
-def run_command(cmd: list[str], check: bool = True) -> subprocess.CompletedProcess:
-    """运行命令"""
+def run_command(
+    cmd: list[str], check: bool = True, capture: bool = False
+) -> subprocess.CompletedProcess:
+    """运行命令
+
+    Args:
+        cmd: 命令及参数
+        check: 命令失败时是否抛出异常
+        capture: 是否捕获输出；不需要输出时直接继承终端，省去管道和解码
+    """
     print_info(f"执行: {' '.join(cmd)}")
-    return subprocess.run(cmd, check=check, capture_output=True, text=True)
+    # 命令均由本脚本以固定参数构造，不含外部输入
+    return subprocess.run(cmd, check=check, capture_output=capture, text=capture)  # noqa: S603
 
 
 def git_status_clean() -> bool:
-    """检查 Git 工作区是否干净"""
-    result = run_command(["git", "status", "--porcelain"], check=False)
+    """检查 Git 工作区是否干净
+
+    未跟踪文件同样视为改动（提交时会执行 ``git add .``），
+    并通过 ``--no-optional-locks`` 避免刷新索引。
+    """
+    result = run_command(
+        ["git", "--no-optional-locks", "status", "--porcelain"],
+        check=False,
+        capture=True,
+    )
     return len(result.stdout.strip()) == 0
 
 
@@ -220,9 +270,7 @@ def main() -> None:
             print_info(f"版本号: {current} → {new_version}")
 
             # 更新文件
-            update_version_file(new_version)
-            update_pyproject_toml(new_version)
-            update_changelog(new_version)
+            update_files(new_version)
 
             print_success(f"版本号已更新到 {new_version}")
 
@@ -11,13 +11,39 @@
 """
 
 import argparse
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import os
 from pathlib import Path
 import sys
 
 
+# 跳过的特殊目录
+SKIP_DIRS = frozenset({'__pycache__', '.venv', 'venv', 'build', 'dist'})
+
+# 许可声明检测范围（字符数）
+HEADER_SCAN_LIMIT = 1000
+
+# 检测时预读的字节数（UTF-8 每字符最多 4 字节，保证覆盖检测范围）
+HEADER_PREFIX_BYTES = HEADER_SCAN_LIMIT * 4
+
+COPYRIGHT_MARKER = 'Copyright'
+COMPANY_MARKER = '广东轻亿云软件科技有限公司'
+QEASY_MARKER = 'qeasy'
+
+# 严格模式下的标记组：(AGPL 许可声明, 商业许可提示)，每组至少出现一个
+_STRICT_MARKERS = (
+    ('AGPL', 'GNU Affero General Public License'),
+    ('COMMERCIAL-LICENSE', '商业'),
+)
+
+
 def check_license_header(file_path: Path, strict: bool = False) -> tuple[bool, str]:
     """检查文件是否包含许可声明
     
+    只读取并解码文件开头，在前 HEADER_SCAN_LIMIT 个字符内检查标记，无需读取整个文件。
+    
     Args:
         file_path: 文件路径
         strict: 严格模式，检查是否包含 AGPL-3.0
@@ -26,16 +52,21 @@ def check_license_header(file_path: Path, strict: bool = False) -> tuple[bool, s
         (is_valid, message)
     """
     try:
-        content = file_path.read_text(encoding='utf-8')
+        with file_path.open('rb') as f:
+            prefix = f.read(HEADER_PREFIX_BYTES)
     except Exception as e:
         return False, f"无法读取文件: {e}"
+    head = prefix.decode('utf-8', errors='ignore')[:HEADER_SCAN_LIMIT]
     
-    first_lines = content[:1000]
-    
-    # 基本检查
-    has_copyright = 'Copyright' in first_lines
-    has_company = '广东轻亿云软件科技有限公司' in first_lines or 'qeasy' in first_lines.lower()
+    # 快速路径：绝大多数文件的许可声明都是完整的
+    has_copyright = COPYRIGHT_MARKER in head
+    has_company = has_copyright and (COMPANY_MARKER in head or QEASY_MARKER in head.lower())
+    if has_company and (
+        not strict or all(any(m in head for m in group) for group in _STRICT_MARKERS)
+    ):
+        return True, "OK"
     
+    # 以下仅在检查未通过时执行，用于给出具体原因
     if not has_copyright:
         return False, "缺少 Copyright 声明"
     
@@ -44,8 +75,9 @@ def check_license_header(file_path: Path, strict: bool = False) -> tuple[bool, s
     
     # 严格模式：检查 AGPL-3.0
     if strict:
-        has_agpl = 'AGPL' in first_lines or 'GNU Affero General Public License' in first_lines
-        has_commercial_notice = 'COMMERCIAL-LICENSE' in first_lines or '商业' in first_lines
+        agpl_markers, commercial_markers = _STRICT_MARKERS
+        has_agpl = any(m in head for m in agpl_markers)
+        has_commercial_notice = any(m in head for m in commercial_markers)
         
         if not has_agpl:
             return False, "缺少 AGPL-3.0 许可声明"
@@ -56,28 +88,46 @@ def check_license_header(file_path: Path, strict: bool = False) -> tuple[bool, s
     return True, "OK"
 
 
-def check_directory(directory: Path, strict: bool = False) -> tuple[list, list]:
-    """检查目录中的所有 Python 文件
+def iter_python_files(directory: Path) -> Iterator[Path]:
+    """遍历目录下的所有 Python 文件
     
-    Returns:
-        (valid_files, invalid_files)
+    使用 os.walk 并原地裁剪特殊目录，不会进入 __pycache__、.venv 等子树。
     """
-    valid_files = []
-    invalid_files = []
+    for dirpath, dirnames, filenames in os.walk(directory):
+        dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+        for filename in filenames:
+            if filename.endswith('.py'):
+                yield Path(dirpath, filename)
+
+
+def check_directory(
+    directory: Path, strict: bool = False, jobs: int | None = None
+) -> Iterator[tuple[bool, Path, str]]:
+    """检查目录中的所有 Python 文件
     
-    for py_file in directory.rglob('*.py'):
-        # 跳过特殊目录
-        if any(part in py_file.parts for part in ['__pycache__', '.venv', 'venv', 'build', 'dist']):
-            continue
-        
-        is_valid, message = check_license_header(py_file, strict)
-        
-        if is_valid:
-            valid_files.append(py_file)
-        else:
-            invalid_files.append((py_file, message))
+    每个文件的检查以 I/O 为主（读取时释放 GIL），使用线程池并行处理。
+    结果按文件逐个产出，调用方无需保留全部合规文件的列表。
+    
+    Args:
+        jobs: 并行线程数，None 表示按 CPU 核数自动选择，1 表示串行处理
     
-    return valid_files, invalid_files
+    Yields:
+        (is_valid, file_path, message)
+    """
+    files = list(iter_python_files(directory))
+    
+    check = partial(check_license_header, strict=strict)
+    if jobs is None:
+        jobs = min(32, (os.cpu_count() or 1) * 4)
+    if jobs == 1 or len(files) <= 1:
+        for py_file in files:
+            is_valid, message = check(py_file)
+            yield is_valid, py_file, message
+        return
+    
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        for py_file, (is_valid, message) in zip(files, executor.map(check, files), strict=True):
+            yield is_valid, py_file, message
 
 
 def main():
@@ -99,6 +149,12 @@ def main():
         action='store_true',
         help='严格模式：检查是否包含完整的 AGPL-3.0 许可声明'
     )
+    parser.add_argument(
+        '--jobs', '-j',
+        type=int,
+        default=None,
+        help='并行线程数（默认按 CPU 核数自动选择，1 表示串行）'
+    )
     
     args = parser.parse_args()
     
@@ -119,7 +175,13 @@ def main():
     print()
     
     # 检查文件
-    valid_files, invalid_files = check_directory(src_dir, args.strict)
+    valid_count = 0
+    invalid_files = []
+    for is_valid, file_path, message in check_directory(src_dir, args.strict, args.jobs):
+        if is_valid:
+            valid_count += 1
+        else:
+            invalid_files.append((file_path, message))
     
     # 显示结果
     if invalid_files:
@@ -131,7 +193,7 @@ def main():
             print(f"     原因: {message}")
         print()
         print("=" * 60)
-        print(f"✅ 合规: {len(valid_files)} 个文件")
+        print(f"✅ 合规: {valid_count} 个文件")
         print(f"❌ 不合规: {len(invalid_files)} 个文件")
         print("=" * 60)
         print()
@@ -142,7 +204,7 @@ def main():
         print("✅ 所有文件都包含许可声明！")
         print()
         print("=" * 60)
-        print(f"检查通过: {len(valid_files)} 个文件")
+        print(f"检查通过: {valid_count} 个文件")
         print("=" * 60)
         return 0
 
@@ -29,35 +29,12 @@ QData Expression - 安全、可扩展的 Python 表达式引擎
 官网: https://www.qeasy.cloud
 """
 
-from ._version import __version__, __version_info__
-
-# 上下文解析
-from .context import (
-    ContextResolver,
-    PathParser,
-    delete_path,
-    flatten_context,
-    has_path,
-    merge_context,
-    resolve,
-    set_path,
-    unflatten_context,
-)
+import importlib
+from typing import TYPE_CHECKING
 
-# 表达式引擎
-from .evaluator import (
-    CompiledExpression,
-    ExpressionCache,
-    ExpressionEngine,
-    LRUCache,
-    SafeEvaluator,
-    evaluate,
-    get_default_engine,
-    register_function,
-    validate,
-)
+from ._version import __version__, __version_info__
 
-# 核心异常类
+# 核心异常类（轻量，直接导入）
 from .exceptions import (
     ContextError,
     ExpressionError,
@@ -77,55 +54,182 @@ from .exceptions import (
     UndefinedVariableError,
 )
 
-# 函数注册
-from .functions import (
-    DATETIME_FUNCTIONS,
-    LIST_FUNCTIONS,
-    LOGIC_FUNCTIONS,
-    MATH_FUNCTIONS,
-    STRING_FUNCTIONS,
-    FunctionCategory,
-    FunctionDefinition,
-    FunctionRegistry,
-    builtin_function,
-    get_all_builtin_functions,
-    get_builtin_functions,
-)
+if TYPE_CHECKING:
+    # 上下文解析
+    from .context import (
+        ContextResolver,
+        PathParser,
+        delete_path,
+        flatten_context,
+        has_path,
+        merge_context,
+        resolve,
+        set_path,
+        unflatten_context,
+    )
 
-# 表达式解析
-from .parser import (
-    ExpressionAnalyzer,
-    ExpressionBuilder,
-    ExpressionParser,
-    ParseResult,
-    extract_variables,
-    is_expression,
-    parse_expression,
-    validate_expression,
-)
+    # 表达式引擎
+    from .evaluator import (
+        CompiledExpression,
+        ExpressionCache,
+        ExpressionEngine,
+        LRUCache,
+        SafeEvaluator,
+        evaluate,
+        get_default_engine,
+        register_function,
+        validate,
+    )
 
-# 安全沙箱
-from .sandbox import (
-    SafeNameResolver,
-    SafetyChecker,
-    SafeWrapper,
-    Sandbox,
-    SandboxConfig,
-    get_expression_safety_issues,
-    is_expression_safe,
-    validate_expression_safety,
-)
+    # 函数注册
+    from .functions import (
+        DATETIME_FUNCTIONS,
+        LIST_FUNCTIONS,
+        LOGIC_FUNCTIONS,
+        MATH_FUNCTIONS,
+        STRING_FUNCTIONS,
+        FunctionCategory,
+        FunctionDefinition,
+        FunctionRegistry,
+        builtin_function,
+        get_all_builtin_functions,
+        get_builtin_functions,
+    )
+
+    # 表达式解析
+    from .parser import (
+        ExpressionAnalyzer,
+        ExpressionBuilder,
+        ExpressionParser,
+        ParseResult,
+        extract_variables,
+        is_expression,
+        parse_expression,
+        validate_expression,
+    )
+
+    # 安全沙箱
+    from .sandbox import (
+        SafeNameResolver,
+        SafetyChecker,
+        SafeWrapper,
+        Sandbox,
+        SandboxConfig,
+        get_expression_safety_issues,
+        is_expression_safe,
+        validate_expression_safety,
+    )
+
+    # 模板引擎
+    from .template import (
+        Jinja2TemplateEngine,
+        SimpleTemplateEngine,
+        TemplateEngine,
+        get_default_template_engine,
+        get_template_variables,
+        render_template,
+        validate_template,
+    )
+
+
+# ============================================================
+# 延迟导入
+# ============================================================
+
+# 子模块 -> 导出名称。子模块在首次访问其导出名称时才导入（PEP 562），
+# 因此 `import qdata_expr` 不会加载 Jinja2 等较重的依赖
+_LAZY_SUBMODULES: dict[str, tuple[str, ...]] = {
+    # 上下文解析
+    "context": (
+        "ContextResolver",
+        "PathParser",
+        "delete_path",
+        "flatten_context",
+        "has_path",
+        "merge_context",
+        "resolve",
+        "set_path",
+        "unflatten_context",
+    ),
+    # 表达式引擎
+    "evaluator": (
+        "CompiledExpression",
+        "ExpressionCache",
+        "ExpressionEngine",
+        "LRUCache",
+        "SafeEvaluator",
+        "evaluate",
+        "get_default_engine",
+        "register_function",
+        "validate",
+    ),
+    # 函数注册
+    "functions": (
+        "DATETIME_FUNCTIONS",
+        "LIST_FUNCTIONS",
+        "LOGIC_FUNCTIONS",
+        "MATH_FUNCTIONS",
+        "STRING_FUNCTIONS",
+        "FunctionCategory",
+        "FunctionDefinition",
+        "FunctionRegistry",
+        "builtin_function",
+        "get_all_builtin_functions",
+        "get_builtin_functions",
+    ),
+    # 表达式解析
+    "parser": (
+        "ExpressionAnalyzer",
+        "ExpressionBuilder",
+        "ExpressionParser",
+        "ParseResult",
+        "extract_variables",
+        "is_expression",
+        "parse_expression",
+        "validate_expression",
+    ),
+    # 安全沙箱
+    "sandbox": (
+        "SafeNameResolver",
+        "SafetyChecker",
+        "SafeWrapper",
+        "Sandbox",
+        "SandboxConfig",
+        "get_expression_safety_issues",
+        "is_expression_safe",
+        "validate_expression_safety",
+    ),
+    # 模板引擎
+    "template": (
+        "Jinja2TemplateEngine",
+        "SimpleTemplateEngine",
+        "TemplateEngine",
+        "get_default_template_engine",
+        "get_template_variables",
+        "render_template",
+        "validate_template",
+    ),
+}
+
+_LAZY_IMPORTS = {
+    name: module for module, names in _LAZY_SUBMODULES.items() for name in names
+}
+
+
+def __getattr__(name: str) -> object:
+    """按需导入子模块中的导出名称"""
+    module = _LAZY_IMPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    # 缓存到模块全局，后续访问不再经过 __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
 
-# 模板引擎
-from .template import (
-    Jinja2TemplateEngine,
-    SimpleTemplateEngine,
-    TemplateEngine,
-    get_default_template_engine,
-    get_template_variables,
-    render_template,
-    validate_template,
-)
 
 __all__ = [
     # 版本信息
@@ -33,13 +33,14 @@ import sys
 from typing import Any
 
 from ._version import __version__
-from .evaluator import ExpressionEngine
-from .functions import FunctionCategory
-from .template import render_template, validate_template
+
+# 各子命令在函数内部导入所需模块，`qdata-expr version` 和 `--help` 不会加载 Jinja2 等依赖
 
 
 def cmd_eval(args: argparse.Namespace) -> int:
     """执行表达式求值命令"""
+    from .evaluator import ExpressionEngine
+
     expression = args.expression
     context: dict[str, Any] = {}
 
@@ -66,6 +67,8 @@ def cmd_eval(args: argparse.Namespace) -> int:
 
 def cmd_render(args: argparse.Namespace) -> int:
     """执行模板渲染命令"""
+    from .template import render_template
+
     template = args.template
     context: dict[str, Any] = {}
 
@@ -87,6 +90,9 @@ def cmd_render(args: argparse.Namespace) -> int:
 
 def cmd_validate(args: argparse.Namespace) -> int:
     """执行验证命令"""
+    from .evaluator import ExpressionEngine
+    from .template import validate_template
+
     expression = args.expression
     validate_type = args.type
 
@@ -111,6 +117,9 @@ def cmd_validate(args: argparse.Namespace) -> int:
 
 def cmd_functions(args: argparse.Namespace) -> int:
     """列出所有内置函数"""
+    from .evaluator import ExpressionEngine
+    from .functions import FunctionCategory
+
     engine = ExpressionEngine()
 
     if args.category:
@@ -20,6 +20,10 @@
 
 import copy
 import re
+import string
+import sys
+from collections.abc import Callable
+from functools import lru_cache
 from typing import Any
 
 from .exceptions import InvalidPathError
@@ -29,6 +33,11 @@ from .exceptions import InvalidPathError
 # ============================================================
 
 
+# 标识符首字符和后续字符（与路径语法一致，仅 ASCII）
+_IDENT_START = frozenset(string.ascii_letters + "_")
+_IDENT_CHARS = frozenset(string.ascii_letters + string.digits + "_")
+
+
 class PathParser:
     """路径解析器
 
@@ -41,20 +50,16 @@ class PathParser:
     - 混合格式: users[0].address.city
     """
 
-    # 路径部分匹配模式
+    # 路径部分匹配模式：.key 或 key | [index] | ['key'] | ["key"]
+    # 子类可覆盖以支持其他格式；未覆盖时 parse_tuple 使用等价的手写扫描器，
+    # 无法匹配的字符同样被跳过
     PATH_PATTERN = re.compile(
-        r"""
-        \.?([a-zA-Z_][a-zA-Z0-9_]*)  # .key 或 key
-        |
-        \[(\d+)\]                      # [index]
-        |
-        \['([^']+)'\]                  # ['key']
-        |
-        \["([^"]+)"\]                  # ["key"]
-        """,
-        re.VERBOSE,
+        r"\.?([a-zA-Z_][a-zA-Z0-9_]*)|\[(\d+)\]|\['([^']+)'\]|\[\"([^\"]+)\"\]"
     )
 
+    # 纯点号路径（如 user.address.city），可直接按点号切分
+    DOTTED_PATTERN = re.compile(r"[a-zA-Z_][a-zA-Z0-9_]*(?:\.[a-zA-Z_][a-zA-Z0-9_]*)*")
+
     @classmethod
     def parse(cls, path: str) -> list[str | int]:
         """解析路径为部分列表
@@ -73,9 +78,42 @@ class PathParser:
             >>> PathParser.parse("users[0].address.city")
             ['users', 0, 'address', 'city']
         """
+        return list(cls.parse_tuple(path))
+
+    @classmethod
+    @lru_cache(maxsize=4096)
+    def parse_tuple(cls, path: str) -> tuple[str | int, ...]:
+        """解析路径为部分元组（按路径字符串缓存）
+
+        路径解析是纯函数，应用中出现的路径种类有限，
+        重复解析同一路径只需一次字典查找。返回不可变元组，可安全共享；
+        其中的字符串键均已通过 sys.intern 驻留。
+
+        Args:
+            path: 路径字符串
+
+        Returns:
+            路径部分元组
+        """
         if not path:
-            return []
+            return ()
+
+        if cls.PATH_PATTERN is not PathParser.PATH_PATTERN:
+            # 子类自定义了匹配模式，按该模式逐段匹配
+            parts = cls._match_parts(path)
+        # 快速路径：最常见的纯点号路径不需要逐段匹配
+        elif cls.DOTTED_PATTERN.fullmatch(path):
+            parts: list[str | int] = path.split(".")
+        else:
+            parts = cls._scan(path)
 
+        # 驻留字符串键：与上下文中同样驻留的键比较时只需比较对象身份，
+        # 不同路径中的相同键也共享同一对象
+        return tuple(sys.intern(p) if type(p) is str else p for p in parts)
+
+    @classmethod
+    def _match_parts(cls, path: str) -> list[str | int]:
+        """按 PATH_PATTERN 逐段匹配路径（分组依次为 键、索引、单引号键、双引号键）"""
         parts: list[str | int] = []
         for match in cls.PATH_PATTERN.finditer(path):
             if match.group(1):
@@ -90,6 +128,55 @@ class PathParser:
             elif match.group(4):
                 # 双引号字符串键
                 parts.append(match.group(4))
+        return parts
+
+    @staticmethod
+    def _scan(path: str) -> list[str | int]:
+        """逐字符扫描路径，按首字符分派到各路径部分
+
+        中括号内容用 str.find 一次定位到结束位置，不逐字符扫描。
+        """
+        parts: list[str | int] = []
+        n = len(path)
+        i = 0
+        while i < n:
+            char = path[i]
+            if char == ".":
+                # .key：点号后必须紧跟标识符，否则跳过该点号
+                i += 1
+                if i >= n or path[i] not in _IDENT_START:
+                    continue
+                char = path[i]
+
+            if char in _IDENT_START:
+                # key
+                j = i + 1
+                while j < n and path[j] in _IDENT_CHARS:
+                    j += 1
+                parts.append(path[i:j])
+                i = j
+                continue
+
+            if char == "[" and i + 1 < n:
+                quote = path[i + 1]
+                if quote == "'" or quote == '"':
+                    # ['key'] 或 ["key"]
+                    j = path.find(quote, i + 2)
+                    if j > i + 2 and path.startswith("]", j + 1):
+                        parts.append(path[i + 2:j])
+                        i = j + 2
+                        continue
+                else:
+                    # [index]
+                    j = path.find("]", i + 1)
+                    digits = path[i + 1:j]
+                    if j > i + 1 and digits.isdecimal():
+                        parts.append(int(digits))
+                        i = j + 1
+                        continue
+
+            # 无法识别的字符直接跳过
+            i += 1
 
         return parts
 
@@ -106,16 +193,160 @@ class PathParser:
         if not parts:
             return ""
 
+        first = parts[0]
+        head = f"[{first}]" if isinstance(first, int) else first
+        return head + "".join(
+            f"[{part}]" if isinstance(part, int) else f".{part}" for part in parts[1:]
+        )
+
+
+# ============================================================
+# 路径访问器
+# ============================================================
+
+
+# 生成的访问函数中表示“键不存在”的哨兵
+_MISSING = object()
+
+
+def _accessor_source(parts: tuple[str | int, ...]) -> str:
+    """生成按固定路径取值的函数源码
+
+    逐段展开 ContextResolver.resolve 的取值逻辑，语义与其完全一致。
+    最常见的普通 dict 先用 type() 精确判断，并以一次 get 完成查找；
+    dict 子类仍走 in + [] 以保留其自定义行为。
+    键名通过 repr() 转为字面量，索引均为非负整数，不会注入任意代码。
+    """
+    lines = ["def _accessor(current, default):", "    try:"]
+    for part in parts:
+        if isinstance(part, int):
+            lines.append("        if current is None:")
+            lines.append("            return default")
+            lines.append(
+                f"        if isinstance(current, (list, tuple)) and {part} < len(current):"
+            )
+            lines.append(f"            current = current[{part}]")
+        else:
+            key = repr(part)
+            lines.append("        if type(current) is dict:")
+            lines.append(f"            current = current.get({key}, _MISSING)")
+            lines.append("            if current is _MISSING:")
+            lines.append("                return default")
+            lines.append("        elif current is None:")
+            lines.append("            return default")
+            lines.append("        elif isinstance(current, dict):")
+            lines.append(f"            if {key} not in current:")
+            lines.append("                return default")
+            lines.append(f"            current = current[{key}]")
+            lines.append(f"        elif hasattr(current, {key}):")
+            lines.append(f"            current = getattr(current, {key})")
+        lines.append("        else:")
+        lines.append("            return default")
+    lines.append("    except (KeyError, IndexError, TypeError, AttributeError):")
+    lines.append("        return default")
+    lines.append("    return current")
+    return "\n".join(lines)
+
+
+@lru_cache(maxsize=1024)
+def _compile_accessor(parts: tuple[str | int, ...]) -> Callable[[Any, Any], Any]:
+    """编译并缓存路径访问函数
+
+    同一路径通常被反复解析，直接执行展开后的代码可省去按路径部分循环判断的开销。
+
+    Args:
+        parts: 路径部分元组（PathParser.parse_tuple 的结果）
+
+    Returns:
+        签名为 (context, default) -> value 的函数
+    """
+    namespace: dict[str, Any] = {"_MISSING": _MISSING}
+    # 生成的源码只来自解析后的路径部分：键名经 repr() 转为字面量，索引为整数
+    exec(_accessor_source(parts), namespace)  # noqa: S102
+    return namespace["_accessor"]
+
+
+def _return_default(current: Any, default: Any) -> Any:
+    """无法解析的路径：总是返回默认值"""
+    return default
+
+
+# ============================================================
+# 上下文拷贝
+# ============================================================
+
+
+# 不可变的原子类型，拷贝时直接复用原对象
+_ATOMIC_TYPES = frozenset({str, int, float, bool, type(None), bytes})
+
+
+def _fast_deep_copy(obj: Any, memo: dict[int, Any] | None = None) -> Any:
+    """针对 JSON 结构的深拷贝
+
+    按 type() 精确匹配 dict/list/tuple 递归拷贝，原子值直接返回，
+    其余类型（包括 dict/list 的子类）交给 copy.deepcopy 处理。
+    不传 memo 时不做去重：同一子对象被多处引用时会拷贝多份，且不支持循环引用；
+    传入 memo 时与 copy.deepcopy 共用，同一对象只拷贝一次，拷贝结果保留原有的共享关系。
+
+    Args:
+        obj: 要拷贝的对象
+        memo: 可选的 id -> 拷贝结果映射，在一次拷贝操作内共享
+
+    Returns:
+        拷贝后的对象
+    """
+    t = type(obj)
+    if t in _ATOMIC_TYPES:
+        return obj
+    if memo is None:
+        if t is dict:
+            return {k: _fast_deep_copy(v) for k, v in obj.items()}
+        if t is list:
+            return [_fast_deep_copy(v) for v in obj]
+        if t is tuple:
+            return tuple([_fast_deep_copy(v) for v in obj])
+        return copy.deepcopy(obj)
+
+    oid = id(obj)
+    copied = memo.get(oid, _MISSING)
+    if copied is not _MISSING:
+        return copied
+    # 原对象在整个拷贝期间都被源结构引用，id 不会被复用，无需像 copy.deepcopy 那样额外保活
+    if t is dict:
+        # 先登记再填充，以支持循环引用
+        result: Any = {}
+        memo[oid] = result
+        for k, v in obj.items():
+            result[k] = v if type(v) in _ATOMIC_TYPES else _fast_deep_copy(v, memo)
+        return result
+    if t is list:
         result = []
-        for i, part in enumerate(parts):
-            if isinstance(part, int):
-                result.append(f"[{part}]")
-            elif i == 0:
-                result.append(part)
-            else:
-                result.append(f".{part}")
+        memo[oid] = result
+        result.extend([v if type(v) in _ATOMIC_TYPES else _fast_deep_copy(v, memo) for v in obj])
+        return result
+    if t is tuple:
+        result = memo[oid] = tuple([_fast_deep_copy(v, memo) for v in obj])
+        return result
+    return copy.deepcopy(obj, memo)
+
 
-        return "".join(result)
+def _shallow_copy(obj: Any) -> Any:
+    """浅拷贝 dict/list（写时复制路径上的容器），其他对象原样返回"""
+    if isinstance(obj, (dict, list)):
+        return copy.copy(obj)
+    return obj
+
+
+def _replace_item(container: Any, key: str | int, value: Any) -> Any:
+    """返回将 container[key] 替换为 value 后的新容器，不修改原容器"""
+    if isinstance(container, tuple):
+        items = list(container)
+        items[key] = value
+        # 具名元组通过 _make 保留原类型
+        return container._make(items) if hasattr(container, "_make") else tuple(items)
+    new = copy.copy(container)
+    new[key] = value
+    return new
 
 
 # ============================================================
@@ -149,6 +380,15 @@ class ContextResolver:
 
     def __init__(self, path_parser: PathParser | None = None):
         self._parser = path_parser or PathParser()
+        # 路径字符串 -> 访问函数，热点路径只需一次缓存查找
+        self._accessor = lru_cache(maxsize=4096)(self._build_accessor)
+
+    def _build_accessor(self, path: str) -> Callable[[Any, Any], Any]:
+        """解析路径并取得对应的访问函数"""
+        parts = self._parser.parse_tuple(path)
+        if not parts:
+            return _return_default
+        return _compile_accessor(parts)
 
     def resolve(
         self,
@@ -169,40 +409,7 @@ class ContextResolver:
         if not path:
             return context
 
-        parts = self._parser.parse(path)
-        if not parts:
-            return default
-
-        current = context
-        for part in parts:
-            if current is None:
-                return default
-
-            try:
-                if isinstance(part, int):
-                    # 数组索引
-                    if isinstance(current, (list, tuple)):
-                        if 0 <= part < len(current):
-                            current = current[part]
-                        else:
-                            return default
-                    else:
-                        return default
-                else:
-                    # 字典键或对象属性
-                    if isinstance(current, dict):
-                        if part in current:
-                            current = current[part]
-                        else:
-                            return default
-                    elif hasattr(current, part):
-                        current = getattr(current, part)
-                    else:
-                        return default
-            except (KeyError, IndexError, TypeError, AttributeError):
-                return default
-
-        return current
+        return self._accessor(path)(context, default)
 
     def has(self, path: str, context: dict[str, Any]) -> bool:
         """检查路径是否存在
@@ -233,7 +440,8 @@ class ContextResolver:
             create_missing: 是否创建缺失的中间路径
 
         Returns:
-            更新后的上下文（新字典）
+            更新后的上下文（新字典）。只拷贝路径上的容器，其余子对象与原上下文共享，
+            修改返回值中未拷贝的子对象会影响原上下文。
 
         Raises:
             InvalidPathError: 路径无效时抛出
@@ -241,12 +449,12 @@ class ContextResolver:
         if not path:
             raise InvalidPathError(path, "路径不能为空")
 
-        parts = self._parser.parse(path)
+        parts = self._parser.parse_tuple(path)
         if not parts:
             raise InvalidPathError(path, "无法解析路径")
 
-        # 深拷贝以避免修改原字典
-        result = copy.deepcopy(context)
+        # 写时复制：只浅拷贝路径上的容器，其余子树与原上下文共享
+        result = _shallow_copy(context)
 
         # 导航到父节点
         current = result
@@ -268,6 +476,8 @@ class ContextResolver:
                     # 根据下一个部分创建空容器
                     next_part = parts[i + 1]
                     current[part] = [] if isinstance(next_part, int) else {}
+                else:
+                    current[part] = _shallow_copy(current[part])
                 current = current[part]
             else:
                 # 字典键
@@ -283,6 +493,8 @@ class ContextResolver:
                         current[part] = [] if isinstance(next_part, int) else {}
                     else:
                         raise InvalidPathError(path, f"键 '{part}' 不存在")
+                else:
+                    current[part] = _shallow_copy(current[part])
                 current = current[part]
 
         # 设置最后一个部分的值
@@ -317,38 +529,43 @@ class ContextResolver:
             context: 上下文字典
 
         Returns:
-            更新后的上下文（新字典）
+            更新后的上下文（新字典）。只拷贝路径上的容器，其余子对象与原上下文共享，
+            修改返回值中未拷贝的子对象会影响原上下文。
         """
         if not path:
             raise InvalidPathError(path, "路径不能为空")
 
-        parts = self._parser.parse(path)
+        parts = self._parser.parse_tuple(path)
         if not parts:
             raise InvalidPathError(path, "无法解析路径")
 
-        # 深拷贝
-        result = copy.deepcopy(context)
-
-        # 导航到父节点
-        current = result
+        # 在原上下文上定位父节点，记录路径上的容器
+        containers = []
+        current = context
         for part in parts[:-1]:
             if isinstance(part, int):
                 if not isinstance(current, (list, tuple)) or part >= len(current):
-                    return result  # 路径不存在，直接返回
-                current = current[part]
+                    return copy.copy(context)  # 路径不存在，直接返回
             else:
                 if not isinstance(current, dict) or part not in current:
-                    return result
-                current = current[part]
+                    return copy.copy(context)
+            containers.append(current)
+            current = current[part]
 
         # 删除最后一个部分
         last_part = parts[-1]
         if isinstance(last_part, int):
-            if isinstance(current, list) and 0 <= last_part < len(current):
-                del current[last_part]
+            if not (isinstance(current, list) and 0 <= last_part < len(current)):
+                return copy.copy(context)
         else:
-            if isinstance(current, dict) and last_part in current:
-                del current[last_part]
+            if not (isinstance(current, dict) and last_part in current):
+                return copy.copy(context)
+        result = copy.copy(current)
+        del result[last_part]
+
+        # 写时复制：自底向上替换路径上的容器，其余子树与原上下文共享
+        for container, part in zip(reversed(containers), reversed(parts[:-1]), strict=True):
+            result = _replace_item(container, part, result)
 
         return result
 
@@ -371,7 +588,8 @@ class ContextResolver:
         if not deep:
             return {**context, **updates}
 
-        result = copy.deepcopy(context)
+        # 原上下文整体拷贝一次，内部被多处引用的子对象只拷贝一次（与 copy.deepcopy 一致）
+        result = _fast_deep_copy(context, {})
         self._deep_merge(result, updates)
         return result
 
@@ -384,8 +602,13 @@ class ContextResolver:
                 and isinstance(value, dict)
             ):
                 self._deep_merge(base[key], value)
+            elif type(value) in _ATOMIC_TYPES:
+                # 不可变的原子值无需拷贝
+                base[key] = value
             else:
-                base[key] = copy.deepcopy(value)
+                # 每个更新值使用独立的 memo：不能与原上下文的拷贝共用，
+                # 否则同一对象会拿到已被合并修改过的拷贝
+                base[key] = _fast_deep_copy(value, {})
 
     def flatten(
         self,
@@ -409,14 +632,20 @@ class ContextResolver:
         """
         result = {}
 
-        for key, value in context.items():
-            full_key = f"{prefix}{separator}{key}" if prefix else key
-
-            if isinstance(value, dict):
-                nested = self.flatten(value, separator, full_key)
-                result.update(nested)
-            else:
+        # 用显式栈代替递归，每层保存（路径前缀，键值迭代器），
+        # 遇到子字典时压栈、迭代完毕时出栈，输出顺序与深度优先递归一致
+        stack = [(prefix, iter(context.items()))]
+        while stack:
+            current_prefix, items = stack[-1]
+            for key, value in items:
+                full_key = f"{current_prefix}{separator}{key}" if current_prefix else key
+
+                if isinstance(value, dict):
+                    stack.append((full_key, iter(value.items())))
+                    break
                 result[full_key] = value
+            else:
+                stack.pop()
 
         return result
 
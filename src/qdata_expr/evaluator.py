@@ -19,27 +19,33 @@
 """
 
 import ast
-import hashlib
+import math
+import operator
 import threading
 from collections import OrderedDict
-from collections.abc import Callable
-from dataclasses import dataclass, field
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+from types import MappingProxyType
 from typing import Any
 
 from .exceptions import (
+    ExpressionError,
     ExpressionEvalError,
     ExpressionParseError,
     UndefinedFunctionError,
     UndefinedVariableError,
 )
 from .functions.base import (
+    FunctionCategory,
     FunctionRegistry,
 )
 from .functions.datetime_funcs import DATETIME_FUNCTIONS
 from .functions.list_funcs import LIST_FUNCTIONS
-from .functions.logic_funcs import LOGIC_FUNCTIONS
+from .functions.logic_funcs import LOGIC_FUNCTIONS, expr_if_else
 from .functions.math_funcs import MATH_FUNCTIONS
 from .functions.string_funcs import STRING_FUNCTIONS
+from .parser import ExpressionAnalyzer, ExpressionParser, fold_constants, parse_cached
 from .sandbox import Sandbox, SandboxConfig
 
 # ============================================================
@@ -50,9 +56,16 @@ from .sandbox import Sandbox, SandboxConfig
 class LRUCache:
     """LRU 缓存
 
-    线程安全的 LRU 缓存实现。
+    可在多个线程间共享，但只有 clear 持锁；get/put/put_new 不加锁。
+
+    不加锁的操作依赖 OrderedDict 单个操作（取值、setdefault、move_to_end、popitem）
+    由 C 实现、在 GIL 下原子执行：并发时不会破坏内部结构或抛出异常，
+    键刚好被其他线程淘汰时按未命中处理。淘汰顺序与容量只是近似保证，
+    并发写入时大小可能短暂超过 max_size；命中统计可能少计，仅作参考。
     """
 
+    __slots__ = ("max_size", "_cache", "_lock", "_hits", "_misses")
+
     def __init__(self, max_size: int = 1000):
         self.max_size = max_size
         self._cache: OrderedDict[str, Any] = OrderedDict()
@@ -66,25 +79,46 @@ class LRUCache:
         Returns:
             (是否命中, 值)
         """
-        with self._lock:
-            if key in self._cache:
-                # 移动到末尾（最近使用）
-                self._cache.move_to_end(key)
-                self._hits += 1
-                return True, self._cache[key]
+        cache = self._cache
+        try:
+            value = cache[key]
+            # 移动到末尾（最近使用）
+            cache.move_to_end(key)
+        except KeyError:
             self._misses += 1
             return False, None
+        self._hits += 1
+        return True, value
 
     def put(self, key: str, value: Any) -> None:
-        """存入缓存"""
-        with self._lock:
-            if key in self._cache:
-                self._cache.move_to_end(key)
-            else:
-                if len(self._cache) >= self.max_size:
-                    # 移除最老的项
-                    self._cache.popitem(last=False)
-                self._cache[key] = value
+        """存入缓存（键已存在时保留原值）"""
+        cache = self._cache
+        cache.setdefault(key, value)
+        try:
+            cache.move_to_end(key)
+        except KeyError:
+            # 已被其他线程淘汰
+            return
+        while len(cache) > self.max_size:
+            try:
+                # 移除最老的项
+                cache.popitem(last=False)
+            except KeyError:
+                break
+
+    def put_new(self, key: str, value: Any) -> None:
+        """存入刚确认未命中的键
+
+        供"查询未命中 -> 计算 -> 存入"的路径使用，省去键是否存在的检查：
+        容量已满时先移除最老的项，再直接插入到末尾。
+        """
+        cache = self._cache
+        if len(cache) >= self.max_size:
+            try:
+                cache.popitem(last=False)
+            except KeyError:
+                pass
+        cache[key] = value
 
     def clear(self) -> None:
         """清空缓存"""
@@ -106,7 +140,263 @@ class LRUCache:
         }
 
 
-@dataclass
+# 原生函数无法求值、名称槽位未解析时的占位值
+_MISSING = object()
+
+# 未提供上下文时使用的只读空映射
+_EMPTY_MAPPING: Mapping[str, Any] = MappingProxyType({})
+
+# 引擎提供的数学常量，上下文中的同名变量优先
+_MATH_CONSTANTS: Mapping[str, float] = MappingProxyType({
+    "e": math.e,
+    "pi": math.pi,
+    "inf": math.inf,
+    "nan": math.nan,
+})
+
+# 可直接编译为 Python 函数的节点类型
+# 仅包含常量、变量和算术/位/一元运算，这些节点的 Python 语义与 SafeEvaluator 完全一致，
+# 且无法访问属性、下标或调用函数。
+_NATIVE_NODE_TYPES = frozenset({
+    ast.Expression,
+    ast.Constant,
+    ast.Name,
+    ast.Load,
+    ast.BinOp,
+    ast.UnaryOp,
+    ast.Add,
+    ast.Sub,
+    ast.Mult,
+    ast.Div,
+    ast.FloorDiv,
+    ast.Mod,
+    ast.Pow,
+    ast.BitAnd,
+    ast.BitOr,
+    ast.BitXor,
+    ast.LShift,
+    ast.RShift,
+    ast.USub,
+    ast.UAdd,
+    ast.Not,
+    ast.Invert,
+})
+
+
+def _identity(value: Any) -> Any:
+    """单个变量表达式的原生函数"""
+    return value
+
+
+def _build_native(tree: ast.Expression) -> tuple[Callable[..., Any], tuple[str, ...]] | None:
+    """将纯运算表达式编译为原生 Python 函数
+
+    "x + y * 2" 编译为等价于 ``lambda x, y: x + y * 2`` 的函数，
+    由 CPython 字节码直接执行，不再逐节点解释。
+
+    Returns:
+        (函数, 参数名元组)，表达式不满足条件时返回 None
+    """
+    names: set[str] = set()
+    for node in ast.walk(tree):
+        if type(node) not in _NATIVE_NODE_TYPES:
+            return None
+        if isinstance(node, ast.Name):
+            names.add(node.id)
+
+    args = tuple(sorted(names))
+    func_tree = ast.Expression(
+        body=ast.Lambda(
+            args=ast.arguments(
+                posonlyargs=[],
+                args=[ast.arg(arg=name) for name in args],
+                kwonlyargs=[],
+                kw_defaults=[],
+                defaults=[],
+            ),
+            body=tree.body,
+        ),
+    )
+    ast.fix_missing_locations(func_tree)
+    code = compile(func_tree, "<expression>", "eval")
+    # 节点类型已通过白名单校验，且不提供任何内置名称
+    return eval(code, {"__builtins__": {}}), args  # noqa: S307
+
+
+def _annotate_paths(tree: ast.Expression) -> None:
+    """预先展开变量的访问路径
+
+    ``order.items[0].name`` 这类以变量开头、由属性访问和常量下标组成的链，
+    在编译时展开为 (根节点, ((是否属性, 键), ...))，保存在链最外层的节点上，
+    求值时由 SafeEvaluator 循环解析，不再逐层递归分派。
+    AST 结构本身保持不变。
+    """
+    for node in ast.walk(tree):
+        if not isinstance(node, (ast.Attribute, ast.Subscript)):
+            continue
+        steps: list[tuple[bool, Any]] = []
+        current: ast.expr = node
+        while True:
+            if isinstance(current, ast.Attribute):
+                steps.append((True, current.attr))
+            elif isinstance(current, ast.Subscript) and isinstance(current.slice, ast.Constant):
+                steps.append((False, current.slice.value))
+            else:
+                break
+            current = current.value
+        if isinstance(current, ast.Name):
+            steps.reverse()
+            node._qdata_path = (current, tuple(steps))  # type: ignore[attr-defined]
+
+
+def _annotate_operators(tree: ast.Expression) -> None:
+    """预先查好运算符对应的函数
+
+    BinOp/UnaryOp 节点保存为 ``_qdata_op``，Compare 节点保存为 ``_qdata_ops`` 元组，
+    求值时直接调用，不再每次按运算符类型查表。不支持的运算符不做标注，
+    求值时仍按原方式报错。
+    """
+    operators = SafeEvaluator.OPERATORS
+    for node in ast.walk(tree):
+        node_type = type(node)
+        if node_type is ast.BinOp or node_type is ast.UnaryOp:
+            op = operators.get(type(node.op))
+            if op is not None:
+                node._qdata_op = op  # type: ignore[attr-defined]
+        elif node_type is ast.Compare:
+            ops = tuple(operators.get(type(op)) for op in node.ops)
+            if None not in ops:
+                node._qdata_ops = ops  # type: ignore[attr-defined]
+
+
+# ============================================================
+# 指令序列
+# ============================================================
+
+# 编译后的表达式在求值前先降级为扁平的指令序列 ((操作码, 参数), ...)，
+# 由 SafeEvaluator 在一个循环中用栈执行，省去逐节点的递归分派。
+# 不支持的节点以 _OP_EVAL 整体交给 AST 解释器，语义保持一致。
+# 指令中引用的名称在编译时编号为槽位，求值开始时一次性解析为值列表，
+# 同一名称多次出现时只查找一次。
+
+_OP_CONST = 0  # 压入常量
+_OP_NAME = 1  # 压入名称（函数、变量、常量）；参数为名称槽位下标
+_OP_BINOP = 2  # 弹出右操作数，对栈顶执行二元运算；参数为运算函数
+_OP_UNARYOP = 3  # 对栈顶执行一元运算；参数为运算函数
+_OP_COMPARE = 4  # 弹出右操作数，与栈顶比较，结果为 bool；参数为比较函数
+_OP_PATH = 5  # 按编译时展开的路径取值；参数为 (根名称槽位下标, 路径)
+_OP_ATTR = 6  # 取栈顶对象的属性（字典优先按键）；参数为属性名
+_OP_LOAD_FUNC = 7  # 压入具名函数；参数为函数名
+_OP_LOAD_METHOD = 8  # 栈顶对象替换为其方法；参数为方法名
+_OP_CALL = 9  # 调用函数；参数为 (位置参数个数, 关键字参数名元组)
+_OP_CALL3 = 10  # 三参数具名函数调用，if_else 只求值选中的分支；参数为 (函数名, 三个参数的指令序列)
+_OP_BUILD_LIST = 11  # 参数为元素个数
+_OP_BUILD_TUPLE = 12
+_OP_AND = 13  # 参数为各操作数的指令序列
+_OP_OR = 14
+_OP_IFEXP = 15  # 参数为 (条件, 真分支, 假分支) 的指令序列
+_OP_EVAL = 16  # 交给 AST 解释器求值；参数为节点
+
+_Ops = tuple[tuple[int, Any], ...]
+
+
+def _lower(node: ast.expr, slots: dict[str, int]) -> _Ops:
+    """将（已标注的）AST 降级为指令序列
+
+    Args:
+        node: 表达式节点
+        slots: 名称 -> 槽位下标，降级过程中遇到的新名称依次追加
+    """
+    ops: list[tuple[int, Any]] = []
+    _emit(node, ops, slots)
+    return tuple(ops)
+
+
+def _slot(name: str, slots: dict[str, int]) -> int:
+    """返回名称的槽位下标，首次出现时分配"""
+    return slots.setdefault(name, len(slots))
+
+
+def _emit(node: ast.expr, ops: list[tuple[int, Any]], slots: dict[str, int]) -> None:
+    """后序遍历节点，追加对应的指令"""
+    node_type = type(node)
+
+    if node_type is ast.Constant:
+        ops.append((_OP_CONST, node.value))
+    elif node_type is ast.Name:
+        ops.append((_OP_NAME, _slot(node.id, slots)))
+    elif node_type is ast.BinOp and hasattr(node, "_qdata_op"):
+        _emit(node.left, ops, slots)
+        _emit(node.right, ops, slots)
+        ops.append((_OP_BINOP, node._qdata_op))
+    elif node_type is ast.UnaryOp and hasattr(node, "_qdata_op"):
+        _emit(node.operand, ops, slots)
+        ops.append((_OP_UNARYOP, node._qdata_op))
+    elif node_type is ast.Compare and len(node.ops) == 1 and hasattr(node, "_qdata_ops"):
+        _emit(node.left, ops, slots)
+        _emit(node.comparators[0], ops, slots)
+        ops.append((_OP_COMPARE, node._qdata_ops[0]))
+    elif node_type is ast.BoolOp:
+        opcode = _OP_AND if isinstance(node.op, ast.And) else _OP_OR
+        ops.append((opcode, tuple(_lower(value, slots) for value in node.values)))
+    elif node_type is ast.IfExp:
+        branches = (node.test, node.body, node.orelse)
+        ops.append((_OP_IFEXP, tuple(_lower(branch, slots) for branch in branches)))
+    elif node_type is ast.Attribute or node_type is ast.Subscript:
+        _emit_access(node, ops, slots)
+    elif node_type is ast.Call and type(node.func) in (ast.Name, ast.Attribute):
+        _emit_call(node, ops, slots)
+    elif node_type is ast.List or node_type is ast.Tuple:
+        for elt in node.elts:
+            _emit(elt, ops, slots)
+        ops.append((_OP_BUILD_LIST if node_type is ast.List else _OP_BUILD_TUPLE, len(node.elts)))
+    else:
+        # 其余节点（集合、字典、推导式等）交给解释器，保持逐项插入时的报错顺序
+        ops.append((_OP_EVAL, node))
+
+
+def _emit_access(
+    node: ast.Attribute | ast.Subscript,
+    ops: list[tuple[int, Any]],
+    slots: dict[str, int],
+) -> None:
+    """属性和下标访问"""
+    path = getattr(node, "_qdata_path", None)
+    if path is not None:
+        root, steps = path
+        ops.append((_OP_PATH, (_slot(root.id, slots), steps)))
+    elif type(node) is ast.Attribute:
+        _emit(node.value, ops, slots)
+        ops.append((_OP_ATTR, node.attr))
+    elif type(node.slice) is ast.Slice:
+        ops.append((_OP_EVAL, node))
+    else:
+        _emit(node.value, ops, slots)
+        _emit(node.slice, ops, slots)
+        ops.append((_OP_BINOP, operator.getitem))
+
+
+def _emit_call(node: ast.Call, ops: list[tuple[int, Any]], slots: dict[str, int]) -> None:
+    """函数和方法调用，函数先于参数求值"""
+    func = node.func
+    if type(func) is ast.Name:
+        if len(node.args) == 3 and not node.keywords:
+            ops.append((_OP_CALL3, (func.id, tuple(_lower(arg, slots) for arg in node.args))))
+            return
+        ops.append((_OP_LOAD_FUNC, func.id))
+    else:
+        _emit(func.value, ops, slots)
+        ops.append((_OP_LOAD_METHOD, func.attr))
+
+    for arg in node.args:
+        _emit(arg, ops, slots)
+    keywords = [kw for kw in node.keywords if kw.arg]
+    for kw in keywords:
+        _emit(kw.value, ops, slots)
+    ops.append((_OP_CALL, (len(node.args), tuple(kw.arg for kw in keywords))))
+
+
+@dataclass(slots=True)
 class CompiledExpression:
     """编译后的表达式"""
 
@@ -115,43 +405,279 @@ class CompiledExpression:
     code: Any  # 编译后的代码对象
     variables: list[str] = field(default_factory=list)  # 变量列表
     functions: list[str] = field(default_factory=list)  # 函数列表
+    native: Callable[..., Any] | None = field(default=None, repr=False)  # 纯运算表达式的原生函数
+    native_args: tuple[str, ...] = ()  # 原生函数的参数名
+    ops: _Ops | None = field(default=None, repr=False)  # 降级后的指令序列
+    slots: tuple[str, ...] = field(default=(), repr=False)  # 指令序列引用的名称，按槽位排列
+    constant: Any = field(default=_MISSING, repr=False)  # 常量表达式的值，其他表达式为 _MISSING
 
     @classmethod
     def compile(cls, expression: str) -> "CompiledExpression":
         """编译表达式"""
+        tree, code = cls._parse_source(expression)
+        return cls._from_parsed(expression, tree, code)
+
+    @staticmethod
+    def _parse_source(expression: str) -> tuple[ast.Expression, Any]:
+        """解析表达式，返回 (AST, 代码对象)"""
         try:
-            tree = ast.parse(expression, mode="eval")
+            tree = parse_cached(expression)
             code = compile(tree, "<expression>", "eval")
+        except SyntaxError as e:
+            raise ExpressionParseError(expression, f"语法错误: {e.msg}", e.offset) from e
+        return tree, code
+
+    @classmethod
+    def _from_parsed(
+        cls,
+        expression: str,
+        tree: ast.Expression,
+        code: Any,
+    ) -> "CompiledExpression":
+        """由解析结果构建编译后的表达式
+
+        可以整体编译为原生函数的表达式由 CPython 编译器完成常量折叠；
+        其余表达式在 AST 上折叠常量子表达式，减少每次求值时的节点分派。
+        """
+        trivial = cls._from_trivial(expression, tree, code)
+        if trivial is not None:
+            return trivial
+
+        # 变量和函数列表在编译时提取一次，使用方无需再次遍历 AST
+        variables, functions = ExpressionAnalyzer().analyze(tree)
+        native = _build_native(tree)
+        if native is None:
+            tree = fold_constants(tree)
+            _annotate_paths(tree)
+            _annotate_operators(tree)
+            slots: dict[str, int] = {}
+            ops = _lower(tree.body, slots)
+        compiled = cls(
+            expression=expression,
+            ast_node=tree,
+            code=code,
+            variables=variables,
+            functions=functions,
+        )
+        if native is not None:
+            compiled.native, compiled.native_args = native
+        elif len(ops) > 1 or ops[0][0] != _OP_EVAL:
+            # 整个表达式都需交给解释器时，不必再经过指令序列
+            compiled.ops = ops
+            compiled.slots = tuple(slots)
+            if len(ops) == 1 and ops[0][0] == _OP_CONST:
+                # 折叠后只剩一个常量，求值时直接返回
+                compiled.constant = ops[0][1]
+        return compiled
+
+    @classmethod
+    def _from_trivial(
+        cls,
+        expression: str,
+        tree: ast.Expression,
+        code: Any,
+    ) -> "CompiledExpression | None":
+        """字面量、单个变量和 ``user.name`` 这类属性路径直接按形状构建
+
+        模板中大量表达式只是取一个值，跳过分析、折叠、标注等遍历，
+        也不必为单个变量生成原生函数。其他表达式返回 None。
+        """
+        body = tree.body
+        node_type = type(body)
+        if node_type is ast.Constant:
+            return cls(expression, tree, code, constant=body.value)
+        if node_type is ast.Name:
             return cls(
-                expression=expression,
-                ast_node=tree,
-                code=code,
+                expression,
+                tree,
+                code,
+                variables=[body.id],
+                native=_identity,
+                native_args=(body.id,),
             )
-        except SyntaxError as e:
-            raise ExpressionParseError(expression, f"语法错误: {e.msg}", e.offset)
+        if node_type is ast.Attribute:
+            steps: list[tuple[bool, Any]] = []
+            current: ast.expr = body
+            while type(current) is ast.Attribute:
+                steps.append((True, current.attr))
+                current = current.value
+            if type(current) is ast.Name:
+                steps.reverse()
+                return cls(
+                    expression,
+                    tree,
+                    code,
+                    variables=[current.id],
+                    ops=((_OP_PATH, (0, tuple(steps))),),
+                    slots=(current.id,),
+                )
+        return None
 
-    def evaluate(self, context: dict[str, Any] | None = None) -> Any:
+    def evaluate(
+        self,
+        context: dict[str, Any] | None = None,
+        functions: Mapping[str, Callable] | None = None,
+        constants: Mapping[str, Any] | None = None,
+    ) -> Any:
         """执行编译后的表达式
 
+        直接求值编译时保存的 AST，不再重复解析表达式字符串。
+        上下文只读不写，不会被复制。
+
         Args:
             context: 上下文变量
+            functions: 可调用的函数映射
+            constants: 常量映射，仅在上下文未定义同名变量时使用
 
         Returns:
             计算结果
         """
-        context = context or {}
-        evaluator = SafeEvaluator(names=context)
-        return evaluator.eval(self.expression)
+        if self.constant is not _MISSING:
+            return self.constant
+        if context is None:
+            context = _EMPTY_MAPPING
+
+        if self._can_use_native(functions):
+            result = self._eval_native(context, constants)
+            if result is not _MISSING:
+                return result
+
+        # 复用当前线程的空闲求值器；嵌套求值（如自定义函数内再求值）会取到另一个实例
+        free = _EVALUATOR_POOL.free
+        evaluator = free.pop() if free else SafeEvaluator()
+        evaluator.names = context
+        evaluator.functions = functions or _EMPTY_MAPPING
+        evaluator.constants = constants if constants is not None else _EMPTY_MAPPING
+        try:
+            if self.ops is not None:
+                return evaluator.eval_ops(self.ops, self.expression, self.slots)
+            return evaluator.eval_tree(self.ast_node, self.expression)
+        finally:
+            # 不再引用本次的上下文
+            evaluator.names = _EMPTY_MAPPING
+            evaluator._slot_values = []
+            free.append(evaluator)
+
+    def evaluate_many(
+        self,
+        contexts: Iterable[dict[str, Any] | None],
+        functions: Mapping[str, Callable] | None = None,
+        constants: Mapping[str, Any] | None = None,
+    ) -> list[Any]:
+        """对多个上下文批量执行编译后的表达式
+
+        求值路径和求值器只准备一次，适合对大量数据逐条求值。
+
+        Args:
+            contexts: 上下文变量序列
+            functions: 可调用的函数映射
+            constants: 常量映射，仅在上下文未定义同名变量时使用
+
+        Returns:
+            计算结果列表，顺序与 contexts 一致
+        """
+        if self.constant is not _MISSING:
+            return [self.constant for _ in contexts]
+
+        use_native = self._can_use_native(functions)
+        evaluator = SafeEvaluator(functions=functions, constants=constants)
+        tree = self.ast_node
+        ops = self.ops
+        slots = self.slots
+        expression = self.expression
+
+        results = []
+        append = results.append
+        for context in contexts:
+            if context is None:
+                context = _EMPTY_MAPPING
+            if use_native:
+                result = self._eval_native(context, constants)
+                if result is not _MISSING:
+                    append(result)
+                    continue
+            evaluator.names = context
+            if ops is not None:
+                append(evaluator.eval_ops(ops, expression, slots))
+            else:
+                append(evaluator.eval_tree(tree, expression))
+        return results
+
+    def _can_use_native(self, functions: Mapping[str, Callable] | None) -> bool:
+        """是否可以使用原生函数
+
+        与函数同名的变量需按解释器的解析顺序处理。
+        """
+        return self.native is not None and (
+            not functions or functions.keys().isdisjoint(self.native_args)
+        )
+
+    def _eval_native(
+        self,
+        context: Mapping[str, Any],
+        constants: Mapping[str, Any] | None = None,
+    ) -> Any:
+        """使用原生函数求值，变量缺失时返回 _MISSING"""
+        try:
+            args = [context[name] for name in self.native_args]
+        except KeyError:
+            if not constants:
+                # 变量缺失时交给解释器给出准确的错误
+                return _MISSING
+            try:
+                args = [
+                    context[name] if name in context else constants[name]
+                    for name in self.native_args
+                ]
+            except KeyError:
+                return _MISSING
+        try:
+            return self.native(*args)
+        except Exception as e:
+            raise ExpressionEvalError(self.expression, cause=e) from e
+
+
+def _code_key(code: Any) -> tuple:
+    """生成代码对象的等价键
+
+    仅空白、括号等写法不同的表达式（如 "x+y" 与 "x + y"）编译出相同的字节码，
+    语义和安全检查结果也相同。常量使用 repr 比较，以区分 1、1.0 和 True。
+    """
+    return (code.co_code, repr(code.co_consts), code.co_names)
 
 
 class ExpressionCache:
     """表达式缓存管理器
 
     缓存编译后的表达式以提高性能。
+
+    以原始表达式为键，LRU 淘汰、命中统计与加锁都由 functools.lru_cache 在 C 层完成，
+    命中路径上没有 Python 层的开销。
     """
 
-    def __init__(self, max_size: int = 1000):
-        self._cache = LRUCache(max_size)
+    def __init__(
+        self,
+        max_size: int = 1000,
+        compiler: Callable[[str], CompiledExpression] | None = None,
+    ):
+        """初始化缓存
+
+        Args:
+            max_size: 最大缓存数量
+            compiler: 编译函数（默认为 CompiledExpression.compile），
+                编译失败时抛出的异常不会被缓存
+        """
+        self.max_size = max_size
+        self._compiler = compiler or CompiledExpression.compile
+        # 字节码等价键 -> 编译结果，供写法不同的等价表达式复用
+        self._equivalents = LRUCache(max_size)
+        self._lookup = lru_cache(maxsize=max_size)(self._compile)
+
+    def _compile(self, expression: str) -> CompiledExpression:
+        """编译表达式并登记其字节码等价键（仅在缓存未命中时调用）"""
+        compiled = self._compiler(expression)
+        self._equivalents.put(_code_key(compiled.code), compiled)
+        return compiled
 
     def get_or_compile(self, expression: str) -> CompiledExpression:
         """获取或编译表达式
@@ -162,27 +688,62 @@ class ExpressionCache:
         Returns:
             编译后的表达式
         """
-        cache_key = self._make_key(expression)
-        hit, compiled = self._cache.get(cache_key)
-        if hit:
-            return compiled
+        return self._lookup(expression)
 
-        compiled = CompiledExpression.compile(expression)
-        self._cache.put(cache_key, compiled)
-        return compiled
+    def find_equivalent(self, code: Any) -> CompiledExpression | None:
+        """查找字节码等价的已编译表达式
 
-    def _make_key(self, expression: str) -> str:
-        """生成缓存键"""
-        return hashlib.md5(expression.encode()).hexdigest()
+        Args:
+            code: 代码对象
+
+        Returns:
+            等价的编译结果，不存在时返回 None
+        """
+        hit, compiled = self._equivalents.get(_code_key(code))
+        return compiled if hit else None
 
     def clear(self) -> None:
         """清空缓存"""
-        self._cache.clear()
+        self._lookup.cache_clear()
+        self._equivalents.clear()
 
     @property
     def stats(self) -> dict:
         """获取统计信息"""
-        return self._cache.stats
+        info = self._lookup.cache_info()
+        total = info.hits + info.misses
+        return {
+            "size": info.currsize,
+            "max_size": self.max_size,
+            "hits": info.hits,
+            "misses": info.misses,
+            "hit_rate": info.hits / total if total > 0 else 0,
+        }
+
+
+# 外层上下文不超过该大小时直接复制，查找最快；更大时才使用分层作用域
+_SCOPE_COPY_LIMIT = 64
+
+
+class _Scope(dict):
+    """推导式的局部作用域
+
+    自身只保存迭代变量，外层名称由 SafeEvaluator 沿 outer 链查找，
+    因此进入推导式时无需复制整个上下文，也不会修改外层映射。
+    """
+
+    __slots__ = ("outer",)
+
+    def __init__(self, outer: Mapping[str, Any]) -> None:
+        super().__init__()
+        self.outer = outer
+
+
+def _new_scope(outer: Mapping[str, Any]) -> dict[str, Any]:
+    """为推导式创建可写的名称映射"""
+    if type(outer) is not _Scope and len(outer) <= _SCOPE_COPY_LIMIT:
+        return dict(outer)
+    return _Scope(outer)
 
 
 # ============================================================
@@ -198,41 +759,47 @@ class SafeEvaluator:
 
     # 允许的操作符映射
     OPERATORS = {
-        ast.Add: lambda a, b: a + b,
-        ast.Sub: lambda a, b: a - b,
-        ast.Mult: lambda a, b: a * b,
-        ast.Div: lambda a, b: a / b,
-        ast.FloorDiv: lambda a, b: a // b,
-        ast.Mod: lambda a, b: a % b,
-        ast.Pow: lambda a, b: a ** b,
-        ast.USub: lambda a: -a,
-        ast.UAdd: lambda a: +a,
-        ast.Not: lambda a: not a,
-        ast.Eq: lambda a, b: a == b,
-        ast.NotEq: lambda a, b: a != b,
-        ast.Lt: lambda a, b: a < b,
-        ast.LtE: lambda a, b: a <= b,
-        ast.Gt: lambda a, b: a > b,
-        ast.GtE: lambda a, b: a >= b,
-        ast.Is: lambda a, b: a is b,
-        ast.IsNot: lambda a, b: a is not b,
+        ast.Add: operator.add,
+        ast.Sub: operator.sub,
+        ast.Mult: operator.mul,
+        ast.Div: operator.truediv,
+        ast.FloorDiv: operator.floordiv,
+        ast.Mod: operator.mod,
+        ast.Pow: operator.pow,
+        ast.USub: operator.neg,
+        ast.UAdd: operator.pos,
+        ast.Not: operator.not_,
+        ast.Eq: operator.eq,
+        ast.NotEq: operator.ne,
+        ast.Lt: operator.lt,
+        ast.LtE: operator.le,
+        ast.Gt: operator.gt,
+        ast.GtE: operator.ge,
+        ast.Is: operator.is_,
+        ast.IsNot: operator.is_not,
         ast.In: lambda a, b: a in b,
         ast.NotIn: lambda a, b: a not in b,
-        ast.BitAnd: lambda a, b: a & b,
-        ast.BitOr: lambda a, b: a | b,
-        ast.BitXor: lambda a, b: a ^ b,
-        ast.Invert: lambda a: ~a,
-        ast.LShift: lambda a, b: a << b,
-        ast.RShift: lambda a, b: a >> b,
+        ast.BitAnd: operator.and_,
+        ast.BitOr: operator.or_,
+        ast.BitXor: operator.xor,
+        ast.Invert: operator.invert,
+        ast.LShift: operator.lshift,
+        ast.RShift: operator.rshift,
     }
 
     def __init__(
         self,
-        names: dict[str, Any] | None = None,
-        functions: dict[str, Callable] | None = None,
+        names: Mapping[str, Any] | None = None,
+        functions: Mapping[str, Callable] | None = None,
+        constants: Mapping[str, Any] | None = None,
     ):
-        self.names = names or {}
+        self.names = names if names is not None else _EMPTY_MAPPING
         self.functions = functions or {}
+        # 常量优先级低于变量，变量可覆盖同名常量
+        self.constants = constants if constants is not None else _EMPTY_MAPPING
+        # 指令序列的名称槽位，由 eval_ops 在每次执行前填充
+        self._slot_names: tuple[str, ...] = ()
+        self._slot_values: list[Any] = []
 
     def eval(self, expression: str) -> Any:
         """求值表达式
@@ -244,248 +811,539 @@ class SafeEvaluator:
             计算结果
         """
         try:
-            tree = ast.parse(expression, mode="eval")
+            tree = parse_cached(expression)
+        except SyntaxError as e:
+            raise ExpressionEvalError(expression, cause=e) from e
+        return self.eval_tree(tree, expression)
+
+    def eval_tree(self, tree: ast.Expression, expression: str = "") -> Any:
+        """求值已解析的 AST
+
+        Args:
+            tree: ast.parse(..., mode="eval") 得到的 AST
+            expression: 原始表达式（用于错误信息）
+
+        Returns:
+            计算结果
+        """
+        try:
             return self._eval_node(tree.body)
         except Exception as e:
-            raise ExpressionEvalError(expression, cause=e)
+            raise ExpressionEvalError(expression, cause=e) from e
 
-    def _eval_node(self, node: ast.AST) -> Any:
-        """求值 AST 节点"""
-        # 常量
-        if isinstance(node, ast.Constant):
-            return node.value
+    def eval_ops(self, ops: _Ops, expression: str = "", slots: tuple[str, ...] = ()) -> Any:
+        """执行编译得到的指令序列
 
-        # 名称（变量）
-        if isinstance(node, ast.Name):
-            name = node.id
-            # 先检查函数
-            if name in self.functions:
-                return self.functions[name]
-            # 再检查变量
-            if name in self.names:
-                return self.names[name]
-            # 内置常量
-            if name == "True":
-                return True
-            if name == "False":
-                return False
-            if name == "None":
-                return None
-            raise UndefinedVariableError(name)
-
-        # 二元操作
-        if isinstance(node, ast.BinOp):
-            left = self._eval_node(node.left)
-            right = self._eval_node(node.right)
-            op_type = type(node.op)
-            if op_type in self.OPERATORS:
-                return self.OPERATORS[op_type](left, right)
-            raise ExpressionEvalError("", f"不支持的操作符: {op_type.__name__}")
-
-        # 一元操作
-        if isinstance(node, ast.UnaryOp):
-            operand = self._eval_node(node.operand)
-            op_type = type(node.op)
-            if op_type in self.OPERATORS:
-                return self.OPERATORS[op_type](operand)
-            raise ExpressionEvalError("", f"不支持的操作符: {op_type.__name__}")
-
-        # 比较操作
-        if isinstance(node, ast.Compare):
-            left = self._eval_node(node.left)
-            for op, comparator in zip(node.ops, node.comparators, strict=False):
-                right = self._eval_node(comparator)
-                op_type = type(op)
-                if op_type not in self.OPERATORS:
-                    raise ExpressionEvalError("", f"不支持的比较操作符: {op_type.__name__}")
-                if not self.OPERATORS[op_type](left, right):
-                    return False
-                left = right
-            return True
+        Args:
+            ops: CompiledExpression.ops
+            expression: 原始表达式（用于错误信息）
+            slots: CompiledExpression.slots，指令引用的名称
 
-        # 布尔操作
-        if isinstance(node, ast.BoolOp):
-            if isinstance(node.op, ast.And):
-                for value in node.values:
-                    if not self._eval_node(value):
-                        return False
-                return True
-            if isinstance(node.op, ast.Or):
-                for value in node.values:
-                    if self._eval_node(value):
-                        return True
-                return False
+        Returns:
+            计算结果
+        """
+        # 按 函数、变量、常量 的顺序一次解析所有槽位，找不到的留待执行到时再报错
+        functions = self.functions
+        names = self.names
+        constants = self.constants
+        self._slot_names = slots
+        try:
+            self._slot_values = [
+                functions[name] if name in functions
+                else names[name] if name in names
+                else constants.get(name, _MISSING)
+                for name in slots
+            ]
+            return self._run(ops)
+        except Exception as e:
+            raise ExpressionEvalError(expression, cause=e) from e
 
-        # 条件表达式 (a if b else c)
-        if isinstance(node, ast.IfExp):
-            if self._eval_node(node.test):
-                return self._eval_node(node.body)
-            return self._eval_node(node.orelse)
-
-        # 函数调用
-        if isinstance(node, ast.Call):
-            # 获取函数
-            if isinstance(node.func, ast.Name):
-                func_name = node.func.id
-                if func_name not in self.functions:
-                    raise UndefinedFunctionError(func_name)
-                func = self.functions[func_name]
-            elif isinstance(node.func, ast.Attribute):
-                # 方法调用
-                obj = self._eval_node(node.func.value)
-                func = getattr(obj, node.func.attr)
-            else:
-                raise ExpressionEvalError("", "不支持的函数调用形式")
-
-            # 求值参数
-            args = [self._eval_node(arg) for arg in node.args]
-            kwargs = {kw.arg: self._eval_node(kw.value) for kw in node.keywords if kw.arg}
-
-            return func(*args, **kwargs)
-
-        # 属性访问
-        if isinstance(node, ast.Attribute):
-            obj = self._eval_node(node.value)
-            attr = node.attr
-            # 对于字典，使用键访问
-            if isinstance(obj, dict):
-                if attr in obj:
-                    return obj[attr]
-                # 如果键不存在，尝试作为属性访问（支持 dict 的方法调用）
-                if hasattr(obj, attr):
-                    return getattr(obj, attr)
-                # 键不存在时返回 None（类似于 get 方法）
-                return None
-            return getattr(obj, attr)
-
-        # 下标访问
-        if isinstance(node, ast.Subscript):
-            obj = self._eval_node(node.value)
-            if isinstance(node.slice, ast.Constant):
-                return obj[node.slice.value]
-            if isinstance(node.slice, ast.Slice):
-                return obj[
-                    self._eval_node(node.slice.lower) if node.slice.lower else None:
-                    self._eval_node(node.slice.upper) if node.slice.upper else None:
-                    self._eval_node(node.slice.step) if node.slice.step else None
-                ]
-            return obj[self._eval_node(node.slice)]
-
-        # 列表
-        if isinstance(node, ast.List):
-            return [self._eval_node(elt) for elt in node.elts]
-
-        # 元组
-        if isinstance(node, ast.Tuple):
-            return tuple(self._eval_node(elt) for elt in node.elts)
-
-        # 集合
-        if isinstance(node, ast.Set):
-            return {self._eval_node(elt) for elt in node.elts}
-
-        # 字典
-        if isinstance(node, ast.Dict):
-            return {
-                self._eval_node(k) if k else None: self._eval_node(v)
-                for k, v in zip(node.keys, node.values, strict=False)
-            }
-
-        # 格式化字符串 (f-string)
-        if isinstance(node, ast.JoinedStr):
-            parts = []
-            for value in node.values:
-                if isinstance(value, ast.Constant):
-                    parts.append(str(value.value))
-                elif isinstance(value, ast.FormattedValue):
-                    parts.append(str(self._eval_node(value.value)))
-            return "".join(parts)
+    def _run(self, ops: _Ops) -> Any:
+        """在栈上逐条执行指令，返回栈顶结果"""
+        stack: list[Any] = []
+        handlers = self._OP_HANDLERS
+        for opcode, arg in ops:
+            handlers[opcode](self, stack, arg)
+        return stack[-1]
 
-        # 列表推导式
-        if isinstance(node, ast.ListComp):
-            return self._eval_comprehension(node)
+    def _eval_node(self, node: ast.AST) -> Any:
+        """求值 AST 节点
 
-        # 集合推导式
-        if isinstance(node, ast.SetComp):
-            return set(self._eval_comprehension(node))
+        按节点类型查表分派到对应的处理方法。
+        """
+        try:
+            handler = self._DISPATCH[type(node)]
+        except KeyError:
+            raise ExpressionEvalError(
+                "", f"不支持的表达式类型: {type(node).__name__}"
+            ) from None
+        return handler(self, node)
+
+    def _eval_constant(self, node: ast.Constant) -> Any:
+        """常量"""
+        return node.value
+
+    def _eval_name(self, node: ast.Name) -> Any:
+        """名称（变量）"""
+        return self._lookup_name(node.id)
+
+    def _lookup_name(self, name: str) -> Any:
+        """按 函数、变量、常量、内置常量 的顺序查找名称"""
+        # 先检查函数
+        if name in self.functions:
+            return self.functions[name]
+        # 再检查变量（推导式中由内向外逐层查找）
+        names = self.names
+        while True:
+            if name in names:
+                return names[name]
+            if type(names) is not _Scope:
+                break
+            names = names.outer
+        # 然后是常量
+        if name in self.constants:
+            return self.constants[name]
+        # 内置常量
+        if name == "True":
+            return True
+        if name == "False":
+            return False
+        if name == "None":
+            return None
+        raise UndefinedVariableError(name)
+
+    def _eval_binop(self, node: ast.BinOp) -> Any:
+        """二元操作"""
+        try:
+            op = node._qdata_op  # type: ignore[attr-defined]
+        except AttributeError:
+            op = self._get_operator(node.op)
+        return op(self._eval_node(node.left), self._eval_node(node.right))
 
-        # 字典推导式
-        if isinstance(node, ast.DictComp):
-            return self._eval_dict_comprehension(node)
+    def _eval_unaryop(self, node: ast.UnaryOp) -> Any:
+        """一元操作"""
+        try:
+            op = node._qdata_op  # type: ignore[attr-defined]
+        except AttributeError:
+            op = self._get_operator(node.op)
+        return op(self._eval_node(node.operand))
 
-        # 生成器表达式
-        if isinstance(node, ast.GeneratorExp):
-            return self._eval_comprehension(node)
+    def _eval_compare(self, node: ast.Compare) -> Any:
+        """比较操作"""
+        try:
+            ops = node._qdata_ops  # type: ignore[attr-defined]
+        except AttributeError:
+            ops = [self._get_operator(op, "比较操作符") for op in node.ops]
+        eval_node = self._eval_node
+        left = eval_node(node.left)
+        for compare, comparator in zip(ops, node.comparators, strict=False):
+            right = eval_node(comparator)
+            if not compare(left, right):
+                return False
+            left = right
+        return True
 
-        raise ExpressionEvalError("", f"不支持的表达式类型: {type(node).__name__}")
+    @classmethod
+    def _get_operator(cls, op: ast.AST, kind: str = "操作符") -> Callable[..., Any]:
+        """按运算符节点类型查找对应的函数"""
+        func = cls.OPERATORS.get(type(op))
+        if func is None:
+            raise ExpressionEvalError("", f"不支持的{kind}: {type(op).__name__}")
+        return func
+
+    def _eval_boolop(self, node: ast.BoolOp) -> Any:
+        """布尔操作"""
+        eval_node = self._eval_node
+        if isinstance(node.op, ast.And):
+            for value in node.values:
+                if not eval_node(value):
+                    return False
+            return True
+        for value in node.values:
+            if eval_node(value):
+                return True
+        return False
+
+    def _eval_ifexp(self, node: ast.IfExp) -> Any:
+        """条件表达式 (a if b else c)"""
+        if self._eval_node(node.test):
+            return self._eval_node(node.body)
+        return self._eval_node(node.orelse)
+
+    def _eval_call(self, node: ast.Call) -> Any:
+        """函数调用"""
+        # 获取函数
+        func_node = node.func
+        if type(func_node) is ast.Name:
+            func = self.functions.get(func_node.id)
+            if func is None:
+                raise UndefinedFunctionError(func_node.id)
+            if func is expr_if_else and len(node.args) == 3 and not node.keywords:
+                # 内置 if_else 按条件表达式处理，只求值选中的分支
+                test, body, orelse = node.args
+                return self._eval_node(body if self._eval_node(test) else orelse)
+        elif type(func_node) is ast.Attribute:
+            # 方法调用
+            obj = self._eval_node(func_node.value)
+            func = getattr(obj, func_node.attr)
+        else:
+            raise ExpressionEvalError("", "不支持的函数调用形式")
+
+        # 求值参数
+        eval_node = self._eval_node
+        args = [eval_node(arg) for arg in node.args]
+        if not node.keywords:
+            return func(*args)
+        kwargs = {kw.arg: eval_node(kw.value) for kw in node.keywords if kw.arg}
+        return func(*args, **kwargs)
+
+    def _eval_attribute(self, node: ast.Attribute) -> Any:
+        """属性访问"""
+        path = getattr(node, "_qdata_path", None)
+        if path is not None:
+            return self._eval_path(*path)
+        return self._get_attribute(self._eval_node(node.value), node.attr)
+
+    @staticmethod
+    def _get_attribute(obj: Any, attr: str) -> Any:
+        """获取属性，字典优先按键访问"""
+        # 对于字典，使用键访问
+        if isinstance(obj, dict):
+            if attr in obj:
+                return obj[attr]
+            # 如果键不存在，尝试作为属性访问（支持 dict 的方法调用）
+            if hasattr(obj, attr):
+                return getattr(obj, attr)
+            # 键不存在时返回 None（类似于 get 方法）
+            return None
+        return getattr(obj, attr)
+
+    def _eval_subscript(self, node: ast.Subscript) -> Any:
+        """下标访问"""
+        path = getattr(node, "_qdata_path", None)
+        if path is not None:
+            return self._eval_path(*path)
+        eval_node = self._eval_node
+        obj = eval_node(node.value)
+        index = node.slice
+        if isinstance(index, ast.Constant):
+            return obj[index.value]
+        if isinstance(index, ast.Slice):
+            return obj[
+                eval_node(index.lower) if index.lower else None:
+                eval_node(index.upper) if index.upper else None:
+                eval_node(index.step) if index.step else None
+            ]
+        return obj[eval_node(index)]
+
+    def _eval_path(self, root: ast.Name, steps: tuple[tuple[bool, Any], ...]) -> Any:
+        """按编译时展开的路径逐级取值"""
+        return self._follow_path(self._eval_name(root), steps)
+
+    def _follow_path(self, obj: Any, steps: tuple[tuple[bool, Any], ...]) -> Any:
+        """从 obj 开始沿路径逐级取值"""
+        get_attribute = self._get_attribute
+        for is_attr, key in steps:
+            obj = get_attribute(obj, key) if is_attr else obj[key]
+        return obj
+
+    def _eval_list(self, node: ast.List) -> list:
+        """列表"""
+        eval_node = self._eval_node
+        return [eval_node(elt) for elt in node.elts]
+
+    def _eval_tuple(self, node: ast.Tuple) -> tuple:
+        """元组"""
+        # 先构建列表再转换，tuple() 可按长度一次分配
+        eval_node = self._eval_node
+        return tuple([eval_node(elt) for elt in node.elts])
+
+    def _eval_set(self, node: ast.Set) -> set:
+        """集合"""
+        eval_node = self._eval_node
+        return {eval_node(elt) for elt in node.elts}
+
+    def _eval_dict(self, node: ast.Dict) -> dict:
+        """字典"""
+        eval_node = self._eval_node
+        result = {}
+        for k, v in zip(node.keys, node.values, strict=False):
+            result[eval_node(k) if k else None] = eval_node(v)
+        return result
+
+    def _eval_joined_str(self, node: ast.JoinedStr) -> str:
+        """格式化字符串 (f-string)"""
+        eval_node = self._eval_node
+        parts = []
+        for value in node.values:
+            if isinstance(value, ast.Constant):
+                parts.append(str(value.value))
+            elif isinstance(value, ast.FormattedValue):
+                parts.append(str(eval_node(value.value)))
+        return "".join(parts)
+
+    def _eval_set_comprehension(self, node: ast.SetComp) -> set:
+        """集合推导式"""
+        return set(self._eval_comprehension(node))
 
     def _eval_comprehension(
         self,
         node: ast.ListComp | ast.SetComp | ast.GeneratorExp,
     ) -> list:
         """求值列表/集合/生成器推导式"""
-        # 保存当前 names
-        saved_names = dict(self.names)
-
-        result = []
-        self._eval_generators(
-            generators=node.generators,
-            index=0,
-            callback=lambda: result.append(self._eval_node(node.elt)),
-        )
+        # 迭代变量写入局部作用域，不修改调用方的上下文
+        saved_names = self.names
+        self.names = _new_scope(saved_names)
 
-        # 恢复 names
-        self.names = saved_names
+        eval_node = self._eval_node
+        elt = node.elt
+        try:
+            result = [eval_node(elt) for _ in self._iter_generators(node.generators, 0)]
+        finally:
+            # 恢复 names
+            self.names = saved_names
         return result
 
     def _eval_dict_comprehension(self, node: ast.DictComp) -> dict:
         """求值字典推导式"""
-        # 保存当前 names
-        saved_names = dict(self.names)
+        # 迭代变量写入局部作用域，不修改调用方的上下文
+        saved_names = self.names
+        self.names = _new_scope(saved_names)
 
+        eval_node = self._eval_node
+        key_node = node.key
+        value_node = node.value
         result = {}
-
-        def add_item() -> None:
-            key = self._eval_node(node.key)
-            value = self._eval_node(node.value)
-            result[key] = value
-
-        self._eval_generators(
-            generators=node.generators,
-            index=0,
-            callback=add_item,
-        )
-
-        # 恢复 names
-        self.names = saved_names
+        try:
+            for _ in self._iter_generators(node.generators, 0):
+                key = eval_node(key_node)
+                result[key] = eval_node(value_node)
+        finally:
+            # 恢复 names
+            self.names = saved_names
         return result
 
-    def _eval_generators(
-        self,
-        generators: list[ast.comprehension],
-        index: int,
-        callback: Callable[[], None],
-    ) -> None:
-        """递归求值推导式的生成器"""
-        if index >= len(generators):
-            callback()
-            return
+    def _iter_generators(
+        self, generators: list[ast.comprehension], index: int
+    ) -> Iterator[None]:
+        """依次绑定推导式的迭代变量
 
+        每当所有生成器的迭代变量都已绑定且条件均满足时产出一次，
+        由调用方在循环中求值元素。后续生成器的可迭代对象在每次绑定后重新求值，
+        因此可以引用前面的迭代变量。
+        """
         comp = generators[index]
-        iterable = self._eval_node(comp.iter)
+        names = self.names
+        eval_node = self._eval_node
+        ifs = comp.ifs
+        is_last = index == len(generators) - 1
+
+        # 迭代目标在循环前解析一次
+        target = comp.target
+        target_name = target.id if type(target) is ast.Name else None
+        unpack = (
+            [(i, elt.id) for i, elt in enumerate(target.elts) if type(elt) is ast.Name]
+            if type(target) is ast.Tuple
+            else ()
+        )
 
-        for item in iterable:
+        for item in eval_node(comp.iter):
             # 设置迭代变量
-            if isinstance(comp.target, ast.Name):
-                self.names[comp.target.id] = item
-            elif isinstance(comp.target, ast.Tuple):
+            if target_name is not None:
+                names[target_name] = item
+            else:
                 # 解包
-                for i, elt in enumerate(comp.target.elts):
-                    if isinstance(elt, ast.Name):
-                        self.names[elt.id] = item[i]
+                for i, name in unpack:
+                    names[name] = item[i]
 
             # 检查条件
-            if all(self._eval_node(if_clause) for if_clause in comp.ifs):
-                self._eval_generators(generators, index + 1, callback)
+            if ifs and not all(eval_node(if_clause) for if_clause in ifs):
+                continue
+            if is_last:
+                yield
+            else:
+                yield from self._iter_generators(generators, index + 1)
+
+    # ---------- 指令处理 ----------
+
+    def _op_const(self, stack: list, value: Any) -> None:
+        stack.append(value)
+
+    def _load_slot(self, index: int) -> Any:
+        value = self._slot_values[index]
+        if value is _MISSING:
+            # 按完整的查找顺序处理内置常量，或报告未定义变量
+            return self._lookup_name(self._slot_names[index])
+        return value
+
+    def _op_name(self, stack: list, index: int) -> None:
+        value = self._slot_values[index]
+        if value is _MISSING:
+            value = self._lookup_name(self._slot_names[index])
+        stack.append(value)
+
+    def _op_binop(self, stack: list, op: Callable[[Any, Any], Any]) -> None:
+        right = stack.pop()
+        stack[-1] = op(stack[-1], right)
+
+    def _op_unaryop(self, stack: list, op: Callable[[Any], Any]) -> None:
+        stack[-1] = op(stack[-1])
+
+    def _op_compare(self, stack: list, op: Callable[[Any, Any], Any]) -> None:
+        right = stack.pop()
+        stack[-1] = True if op(stack[-1], right) else False
+
+    def _op_path(self, stack: list, path: tuple) -> None:
+        index, steps = path
+        stack.append(self._follow_path(self._load_slot(index), steps))
+
+    def _op_attr(self, stack: list, attr: str) -> None:
+        stack[-1] = self._get_attribute(stack[-1], attr)
+
+    def _op_load_func(self, stack: list, name: str) -> None:
+        func = self.functions.get(name)
+        if func is None:
+            raise UndefinedFunctionError(name)
+        stack.append(func)
+
+    def _op_load_method(self, stack: list, attr: str) -> None:
+        stack[-1] = getattr(stack[-1], attr)
+
+    def _op_call(self, stack: list, arg: tuple[int, tuple[str, ...]]) -> None:
+        nargs, kwnames = arg
+        kwargs = {}
+        if kwnames:
+            values = stack[-len(kwnames):]
+            del stack[-len(kwnames):]
+            kwargs = dict(zip(kwnames, values, strict=True))
+        if nargs:
+            args = stack[-nargs:]
+            del stack[-nargs:]
+        else:
+            args = []
+        stack[-1] = stack[-1](*args, **kwargs)
+
+    def _op_call3(self, stack: list, arg: tuple[str, tuple[_Ops, _Ops, _Ops]]) -> None:
+        name, (first, second, third) = arg
+        func = self.functions.get(name)
+        if func is None:
+            raise UndefinedFunctionError(name)
+        if func is expr_if_else:
+            # 内置 if_else 按条件表达式处理，只求值选中的分支
+            stack.append(self._run(second if self._run(first) else third))
+        else:
+            stack.append(func(self._run(first), self._run(second), self._run(third)))
+
+    def _op_build_list(self, stack: list, count: int) -> None:
+        items = stack[len(stack) - count:]
+        del stack[len(stack) - count:]
+        stack.append(items)
+
+    def _op_build_tuple(self, stack: list, count: int) -> None:
+        items = tuple(stack[len(stack) - count:])
+        del stack[len(stack) - count:]
+        stack.append(items)
+
+    def _op_and(self, stack: list, operands: tuple[_Ops, ...]) -> None:
+        run = self._run
+        for operand in operands:
+            if not run(operand):
+                stack.append(False)
+                return
+        stack.append(True)
+
+    def _op_or(self, stack: list, operands: tuple[_Ops, ...]) -> None:
+        run = self._run
+        for operand in operands:
+            if run(operand):
+                stack.append(True)
+                return
+        stack.append(False)
+
+    def _op_ifexp(self, stack: list, arg: tuple[_Ops, _Ops, _Ops]) -> None:
+        test, body, orelse = arg
+        stack.append(self._run(body if self._run(test) else orelse))
+
+    def _op_eval(self, stack: list, node: ast.AST) -> None:
+        stack.append(self._eval_node(node))
+
+    # 操作码 -> 处理方法（顺序与 _OP_* 常量一致）
+    _OP_HANDLERS: tuple[Callable[["SafeEvaluator", list, Any], None], ...] = (
+        _op_const,
+        _op_name,
+        _op_binop,
+        _op_unaryop,
+        _op_compare,
+        _op_path,
+        _op_attr,
+        _op_load_func,
+        _op_load_method,
+        _op_call,
+        _op_call3,
+        _op_build_list,
+        _op_build_tuple,
+        _op_and,
+        _op_or,
+        _op_ifexp,
+        _op_eval,
+    )
+
+    # 节点类型 -> 处理方法
+    _DISPATCH: dict[type, Callable[["SafeEvaluator", Any], Any]] = {
+        ast.Constant: _eval_constant,
+        ast.Name: _eval_name,
+        ast.BinOp: _eval_binop,
+        ast.UnaryOp: _eval_unaryop,
+        ast.Compare: _eval_compare,
+        ast.BoolOp: _eval_boolop,
+        ast.IfExp: _eval_ifexp,
+        ast.Call: _eval_call,
+        ast.Attribute: _eval_attribute,
+        ast.Subscript: _eval_subscript,
+        ast.List: _eval_list,
+        ast.Tuple: _eval_tuple,
+        ast.Set: _eval_set,
+        ast.Dict: _eval_dict,
+        ast.JoinedStr: _eval_joined_str,
+        ast.ListComp: _eval_comprehension,
+        ast.SetComp: _eval_set_comprehension,
+        ast.DictComp: _eval_dict_comprehension,
+        ast.GeneratorExp: _eval_comprehension,
+    }
+
+
+class _EvaluatorPool(threading.local):
+    """每个线程一份的空闲 SafeEvaluator 列表
+
+    CompiledExpression.evaluate 每次求值只重新绑定名称、函数和常量，不再新建求值器。
+    """
+
+    def __init__(self) -> None:
+        self.free: list[SafeEvaluator] = []
+
+
+_EVALUATOR_POOL = _EvaluatorPool()
+
+
+def _build_builtin_registry() -> FunctionRegistry:
+    """合并各类内置函数，构建各引擎共用的注册表"""
+    registry = FunctionRegistry()
+    for definitions in (
+        MATH_FUNCTIONS,
+        STRING_FUNCTIONS,
+        DATETIME_FUNCTIONS,
+        LOGIC_FUNCTIONS,
+        LIST_FUNCTIONS,
+    ):
+        for definition in definitions.values():
+            registry.register_definition(definition)
+    # 预先构建可调用对象映射，引擎合并后直接共用
+    registry._callables_view()
+    return registry
+
+
+# 内置函数只在导入时注册一次，引擎构造时整体合并
+_BUILTIN_FUNCTIONS = _build_builtin_registry()
 
 
 # ============================================================
@@ -538,25 +1396,19 @@ class ExpressionEngine:
             sandbox_config: 沙箱配置
         """
         self._function_registry = FunctionRegistry()
-        self._cache = ExpressionCache(cache_size) if enable_cache else None
+        self._cache = (
+            ExpressionCache(cache_size, compiler=self._compile) if enable_cache else None
+        )
         self._sandbox = Sandbox(sandbox_config) if enable_sandbox else None
+        # 变量提取结果依赖已注册的函数名，函数增删时清空
+        self._variables_cache = LRUCache(cache_size) if enable_cache else None
 
         # 注册内置函数
         self._register_builtin_functions()
 
     def _register_builtin_functions(self) -> None:
-        """注册内置函数"""
-        # 注册各类函数
-        for name, definition in MATH_FUNCTIONS.items():
-            self._function_registry.register_definition(definition)
-        for name, definition in STRING_FUNCTIONS.items():
-            self._function_registry.register_definition(definition)
-        for name, definition in DATETIME_FUNCTIONS.items():
-            self._function_registry.register_definition(definition)
-        for name, definition in LOGIC_FUNCTIONS.items():
-            self._function_registry.register_definition(definition)
-        for name, definition in LIST_FUNCTIONS.items():
-            self._function_registry.register_definition(definition)
+        """注册内置函数（合并模块级预先建好的注册表）"""
+        self._function_registry.merge(_BUILTIN_FUNCTIONS)
 
     def register_function(
         self,
@@ -571,13 +1423,14 @@ class ExpressionEngine:
             func: 函数对象
             description: 函数描述
         """
-        from .functions.base import FunctionCategory
         self._function_registry.register(
             name=name,
             func=func,
             category=FunctionCategory.CUSTOM,
             description=description,
         )
+        if self._variables_cache:
+            self._variables_cache.clear()
 
     def unregister_function(self, name: str) -> bool:
         """注销函数
@@ -588,7 +1441,10 @@ class ExpressionEngine:
         Returns:
             是否成功
         """
-        return self._function_registry.unregister(name)
+        removed = self._function_registry.unregister(name)
+        if removed and self._variables_cache:
+            self._variables_cache.clear()
+        return removed
 
     def has_function(self, name: str) -> bool:
         """检查函数是否存在"""
@@ -612,44 +1468,89 @@ class ExpressionEngine:
         Returns:
             计算结果
         """
-        context = context or {}
+        # 获取编译结果（命中缓存时跳过解析和安全检查）
+        compiled = self.compile(expression)
+        if compiled.constant is not _MISSING:
+            # 字面量等常量表达式不需要函数映射
+            return compiled.constant
 
-        # 添加数学常量
-        context = self._add_math_constants(context)
+        # 上下文直接传入，数学常量作为上下文未定义时的后备，不再复制上下文
+        functions = self._function_registry._callables_view()
+        return compiled.evaluate(context, functions, _MATH_CONSTANTS)
 
-        # 安全检查
-        if self._sandbox:
-            self._sandbox.validate_expression(expression)
+    def evaluate_many(
+        self,
+        expressions: Iterable[str],
+        context: dict[str, Any] | None = None,
+        return_exceptions: bool = False,
+    ) -> list[Any]:
+        """在同一上下文中批量求值多个表达式
 
-        # 创建求值器
-        functions = self._function_registry.get_all_callables()
-        evaluator = SafeEvaluator(names=context, functions=functions)
+        函数映射只获取一次，各表达式的编译结果走缓存。
 
-        return evaluator.eval(expression)
+        Args:
+            expressions: 表达式字符串序列
+            context: 上下文变量
+            return_exceptions: 为 True 时，求值失败的表达式以异常对象作为结果，
+                不中断后续表达式；为 False 时直接抛出第一个异常
 
-    def _add_math_constants(self, context: dict[str, Any]) -> dict[str, Any]:
-        """添加数学常量到上下文（如果未定义）
+        Returns:
+            计算结果列表，顺序与 expressions 一致
+        """
+        functions = self._function_registry._callables_view()
+        results = []
+        for expression in expressions:
+            try:
+                compiled = self.compile(expression)
+                results.append(compiled.evaluate(context, functions, _MATH_CONSTANTS))
+            except ExpressionError as e:
+                if not return_exceptions:
+                    raise
+                results.append(e)
+        return results
+
+    def compile(self, expression: str) -> CompiledExpression:
+        """编译表达式
+
+        启用缓存时，相同的表达式只解析和安全检查一次。
 
         Args:
-            context: 原始上下文
+            expression: 表达式字符串
 
         Returns:
-            包含数学常量的上下文
+            编译后的表达式
+
+        Raises:
+            SecurityViolationError: 表达式不安全时抛出
+            ExpressionEvalError: 表达式语法错误时抛出
         """
-        import math
-        result = dict(context)  # 复制，不修改原始上下文
-
-        # 添加常用数学常量
-        if "e" not in result:
-            result["e"] = math.e
-        if "pi" not in result:
-            result["pi"] = math.pi
-        if "inf" not in result:
-            result["inf"] = math.inf
-        if "nan" not in result:
-            result["nan"] = math.nan
+        if self._cache:
+            return self._cache.get_or_compile(expression)
+        return self._compile(expression)
 
-        return result
+    def _compile(self, expression: str) -> CompiledExpression:
+        """编译并安全检查表达式（不使用缓存）
+
+        表达式只解析一次，沙箱直接检查编译得到的 AST。
+        与已缓存表达式字节码等价时直接复用其编译结果。
+        """
+        try:
+            tree, code = CompiledExpression._parse_source(expression)
+        except ExpressionParseError as e:
+            if self._sandbox:
+                # 语法错误沿用沙箱的报错方式
+                self._sandbox.validate_expression(expression)
+            raise ExpressionEvalError(expression, cause=e) from e
+
+        if self._cache:
+            equivalent = self._cache.find_equivalent(code)
+            if equivalent is not None:
+                # 等价表达式已通过安全检查，只需替换原始表达式文本
+                return replace(equivalent, expression=expression)
+
+        if self._sandbox:
+            self._sandbox.validate_tree(tree, expression)
+        return CompiledExpression._from_parsed(expression, tree, code)
 
     def validate(self, expression: str) -> list[str]:
         """验证表达式
@@ -662,9 +1563,9 @@ class ExpressionEngine:
         """
         errors = []
 
-        # 语法检查
+        # 语法检查（解析结果缓存，随后的安全检查不再重复解析）
         try:
-            ast.parse(expression, mode="eval")
+            parse_cached(expression)
         except SyntaxError as e:
             errors.append(f"语法错误: {e.msg}")
             return errors
@@ -685,7 +1586,17 @@ class ExpressionEngine:
         Returns:
             变量名列表
         """
-        from .parser import ExpressionParser
+        if self._variables_cache is None:
+            return self._get_variables_uncached(expression)
+
+        found, variables = self._variables_cache.get(expression)
+        if not found:
+            variables = self._get_variables_uncached(expression)
+            self._variables_cache.put_new(expression, variables)
+        return list(variables)
+
+    def _get_variables_uncached(self, expression: str) -> list[str]:
+        """解析表达式并提取变量（不使用缓存）"""
         parser = ExpressionParser(self._function_registry.list_all())
         result = parser.parse(expression)
         return result.variables
@@ -694,6 +1605,8 @@ class ExpressionEngine:
         """清空缓存"""
         if self._cache:
             self._cache.clear()
+        if self._variables_cache:
+            self._variables_cache.clear()
 
     @property
     def cache_stats(self) -> dict | None:
@@ -714,8 +1627,14 @@ _engine_lock = threading.Lock()
 
 
 def get_default_engine() -> ExpressionEngine:
-    """获取默认表达式引擎"""
+    """获取默认表达式引擎
+
+    创建后直接返回，只有首次创建时加锁（双重检查），避免每次调用都获取锁。
+    """
     global _default_engine
+    engine = _default_engine
+    if engine is not None:
+        return engine
     with _engine_lock:
         if _default_engine is None:
             _default_engine = ExpressionEngine()
@@ -725,6 +1644,9 @@ def get_default_engine() -> ExpressionEngine:
 def evaluate(expression: str, context: dict[str, Any] | None = None) -> Any:
     """求值表达式（使用默认引擎）
 
+    默认引擎在进程内共享并启用缓存，相同表达式只编译一次。
+    需要隔离函数注册或缓存时，请自行创建 ExpressionEngine。
+
     Args:
         expression: 表达式字符串
         context: 上下文变量
@@ -8,9 +8,10 @@
 提供函数注册和管理的基础设施。
 """
 
-from collections.abc import Callable
+from collections.abc import Callable, Mapping
 from dataclasses import dataclass, field
 from enum import Enum
+from types import MappingProxyType
 from typing import Any
 
 
@@ -50,11 +51,9 @@ class FunctionDefinition:
 
     def validate_args(self, args: tuple) -> bool:
         """验证参数数量"""
-        if len(args) < self.min_args:
-            return False
-        if self.max_args is not None and len(args) > self.max_args:
-            return False
-        return True
+        count = len(args)
+        max_args = self.max_args
+        return self.min_args <= count and (max_args is None or count <= max_args)
 
 
 class FunctionRegistry:
@@ -78,6 +77,8 @@ class FunctionRegistry:
     def __init__(self):
         self._functions: dict[str, FunctionDefinition] = {}
         self._aliases: dict[str, str] = {}  # 别名 -> 原名
+        # _callables_view 的结果，注册表变更时清空
+        self._callables: Mapping[str, Callable] | None = None
 
     def register(
         self,
@@ -123,10 +124,12 @@ class FunctionRegistry:
         if aliases:
             for alias in aliases:
                 self._aliases[alias] = name
+        self._callables = None
 
     def register_definition(self, definition: FunctionDefinition) -> None:
         """注册函数定义"""
         self._functions[definition.name] = definition
+        self._callables = None
 
     def unregister(self, name: str) -> bool:
         """注销函数
@@ -145,6 +148,7 @@ class FunctionRegistry:
                 for alias, target in self._aliases.items()
                 if target != name
             }
+            self._callables = None
             return True
         return False
 
@@ -214,13 +218,23 @@ class FunctionRegistry:
         Returns:
             名称到可调用对象的映射
         """
-        callables = {}
-        for name, definition in self._functions.items():
-            callables[name] = definition.func
-        # 添加别名
-        for alias, target in self._aliases.items():
-            if target in self._functions:
-                callables[alias] = self._functions[target].func
+        return dict(self._callables_view())
+
+    def _callables_view(self) -> Mapping[str, Callable]:
+        """获取所有可调用对象的只读映射（供求值使用）
+
+        结果在注册表变更前缓存复用，每次求值不再重新构建。
+        """
+        callables = self._callables
+        if callables is None:
+            built = {}
+            for name, definition in self._functions.items():
+                built[name] = definition.func
+            # 添加别名
+            for alias, target in self._aliases.items():
+                if target in self._functions:
+                    built[alias] = self._functions[target].func
+            callables = self._callables = MappingProxyType(built)
         return callables
 
     def get_safe_callables(self) -> dict[str, Callable]:
@@ -241,9 +255,11 @@ class FunctionRegistry:
         Args:
             other: 另一个注册表
         """
-        for name, definition in other._functions.items():
-            self._functions[name] = definition
+        # 合并进空注册表时两者内容一致，可直接共用对方只读的可调用对象映射
+        inherit = not self._functions and not self._aliases
+        self._functions.update(other._functions)
         self._aliases.update(other._aliases)
+        self._callables = other._callables if inherit else None
 
     def to_documentation(self) -> dict[str, list[dict]]:
         """生成文档
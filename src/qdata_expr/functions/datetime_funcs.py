@@ -8,12 +8,65 @@
 提供日期时间处理相关的内置函数。
 """
 
+import calendar
 from collections.abc import Callable
 from datetime import UTC, date, datetime, time, timedelta
+from functools import lru_cache
 from typing import Any
 
 from .base import FunctionCategory, FunctionDefinition
 
+# 字符串日期时间的解析格式，按优先级排列
+_DATETIME_FORMATS = (
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%d",
+    "%Y/%m/%d %H:%M:%S",
+    "%Y/%m/%d",
+    "%d/%m/%Y",
+    "%d-%m-%Y",
+    "%Y%m%d",
+    "%Y%m%d%H%M%S",
+)
+
+# 各格式中的分隔符只能由格式里的同一字符匹配，字符串包含的分隔符集合与格式不同时必然解析失败
+_SEPARATORS = frozenset("-/:")
+
+
+def _group_formats_by_separators() -> dict[frozenset[str], tuple[str, ...]]:
+    """按分隔符集合对格式分组，组内保持原优先级"""
+    groups: dict[frozenset[str], list[str]] = {}
+    for fmt in _DATETIME_FORMATS:
+        groups.setdefault(_SEPARATORS.intersection(fmt), []).append(fmt)
+    return {key: tuple(formats) for key, formats in groups.items()}
+
+
+_FORMATS_BY_SEPARATORS = _group_formats_by_separators()
+
+# 平年各月天数
+_DAYS_IN_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def _days_in_month(year: int, month: int) -> int:
+    """获取某年某月的天数（查表，避免 calendar.monthrange 额外计算星期）"""
+    if month == 2 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0):
+        return 29
+    return _DAYS_IN_MONTH[month - 1]
+
+
+@lru_cache(maxsize=4096)
+def _parse_datetime(value: str) -> datetime:
+    """按优先级解析日期时间字符串，只尝试分隔符一致的格式
+
+    结果按字符串缓存（datetime 不可变），批量处理中重复出现的值无需再次解析。
+    """
+    for fmt in _FORMATS_BY_SEPARATORS.get(_SEPARATORS.intersection(value), ()):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    raise ValueError(f"无法解析日期时间: {value}")
+
 
 def _to_datetime(value: Any) -> datetime:
     """转换为 datetime"""
@@ -22,24 +75,7 @@ def _to_datetime(value: Any) -> datetime:
     if isinstance(value, date):
         return datetime.combine(value, time.min)
     if isinstance(value, str):
-        # 尝试常见格式
-        formats = [
-            "%Y-%m-%d %H:%M:%S",
-            "%Y-%m-%d %H:%M",
-            "%Y-%m-%d",
-            "%Y/%m/%d %H:%M:%S",
-            "%Y/%m/%d",
-            "%d/%m/%Y",
-            "%d-%m-%Y",
-            "%Y%m%d",
-            "%Y%m%d%H%M%S",
-        ]
-        for fmt in formats:
-            try:
-                return datetime.strptime(value, fmt)
-            except ValueError:
-                continue
-        raise ValueError(f"无法解析日期时间: {value}")
+        return _parse_datetime(value)
     if isinstance(value, (int, float)):
         return datetime.fromtimestamp(value)
     raise TypeError(f"无法将 {type(value).__name__} 转换为 datetime")
@@ -221,10 +257,9 @@ def expr_add_months(value: Any, months: int) -> datetime:
     new_year = dt.year + (new_month - 1) // 12
     new_month = (new_month - 1) % 12 + 1
     # 处理日期溢出（如 1月31日 + 1月 = 2月28日）
-    import calendar
-    max_day = calendar.monthrange(new_year, new_month)[1]
-    new_day = min(dt.day, max_day)
-    return dt.replace(year=new_year, month=new_month, day=new_day)
+    max_day = _days_in_month(new_year, new_month)
+    day = dt.day
+    return dt.replace(year=new_year, month=new_month, day=day if day <= max_day else max_day)
 
 
 def expr_add_years(value: Any, years: int) -> datetime:
@@ -232,7 +267,6 @@ def expr_add_years(value: Any, years: int) -> datetime:
     dt = _to_datetime(value)
     new_year = dt.year + years
     # 处理闰年问题（2月29日）
-    import calendar
     if dt.month == 2 and dt.day == 29:
         if not calendar.isleap(new_year):
             return dt.replace(year=new_year, day=28)
@@ -299,9 +333,8 @@ def expr_start_of_month(value: Any) -> datetime:
 
 def expr_end_of_month(value: Any) -> datetime:
     """获取一月的结束"""
-    import calendar
     dt = _to_datetime(value)
-    last_day = calendar.monthrange(dt.year, dt.month)[1]
+    last_day = _days_in_month(dt.year, dt.month)
     return dt.replace(day=last_day, hour=23, minute=59, second=59, microsecond=999999)
 
 
@@ -349,7 +382,6 @@ def expr_is_weekday(value: Any) -> bool:
 
 def expr_is_leap_year(value: Any) -> bool:
     """是否是闰年"""
-    import calendar
     year = _to_datetime(value).year
     return calendar.isleap(year)
 
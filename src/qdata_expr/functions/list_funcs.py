@@ -9,6 +9,7 @@
 """
 
 from collections.abc import Callable
+from functools import reduce
 from typing import Any
 
 from .base import FunctionCategory, FunctionDefinition
@@ -156,7 +157,6 @@ def expr_reject(value: Any, condition: Callable) -> list:
 
 def expr_reduce(value: Any, func: Callable, initial: Any = None) -> Any:
     """归约"""
-    from functools import reduce
     lst = _to_list(value)
     if initial is not None:
         return reduce(func, lst, initial)
@@ -9,6 +9,7 @@
 """
 
 import math
+import random
 from collections.abc import Callable
 from decimal import ROUND_HALF_UP, Decimal
 from typing import Any, Union
@@ -213,13 +214,11 @@ def expr_degrees(radians: Any) -> float:
 
 def expr_random() -> float:
     """返回 0-1 之间的随机数"""
-    import random
     return random.random()
 
 
 def expr_random_int(a: int, b: int) -> int:
     """返回 a-b 之间的随机整数"""
-    import random
     return random.randint(int(a), int(b))
 
 
@@ -18,10 +18,175 @@
 """
 
 import ast
+import copy
+import operator
 import re
+from collections.abc import Callable
 from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import Any
 
+# ============================================================
+# AST 缓存
+# ============================================================
+
+
+@lru_cache(maxsize=1024)
+def parse_cached(expression: str) -> ast.Expression:
+    """解析表达式为 AST，按表达式字符串缓存
+
+    引擎求值、沙箱检查和 validate 共用此缓存，同一表达式只解析一次。
+    返回的 AST 由所有调用方共享，不得修改其结构。
+
+    Args:
+        expression: 表达式字符串
+
+    Returns:
+        ast.parse(expression, mode="eval") 的结果
+
+    Raises:
+        SyntaxError: 语法错误（不会被缓存）
+    """
+    return ast.parse(expression, mode="eval")
+
+
+# ============================================================
+# 常量折叠
+# ============================================================
+
+
+# 可折叠的运算符（运算符语义固定，不受用户注册函数影响）
+_FOLD_BINOPS: dict[type, Callable[[Any, Any], Any]] = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+    ast.LShift: operator.lshift,
+    ast.RShift: operator.rshift,
+    ast.BitOr: operator.or_,
+    ast.BitXor: operator.xor,
+    ast.BitAnd: operator.and_,
+}
+
+_FOLD_UNARYOPS: dict[type, Callable[[Any], Any]] = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+    ast.Not: operator.not_,
+    ast.Invert: operator.invert,
+}
+
+_FOLD_CMPOPS: dict[type, Callable[[Any, Any], bool]] = {
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+}
+
+# 折叠结果的大小上限：超过上限的字符串/整数保留原表达式，留到求值时计算
+_FOLD_MAX_SIZE = 4096
+
+# 幂运算和移位的右操作数上限，避免编译期构造巨大整数
+_FOLD_MAX_EXPONENT = 128
+
+
+def _foldable_value(value: Any) -> bool:
+    """检查折叠结果是否足够小"""
+    if isinstance(value, (str, bytes)):
+        return len(value) <= _FOLD_MAX_SIZE
+    if isinstance(value, int):
+        return value.bit_length() <= _FOLD_MAX_SIZE
+    return isinstance(value, (float, complex))
+
+
+def _fold_binop(op: ast.operator, left: Any, right: Any) -> Any:
+    """计算常量二元运算，结果可能过大的运算抛出 ValueError"""
+    if isinstance(op, (ast.Pow, ast.LShift)):
+        if not isinstance(right, (int, float)) or abs(right) > _FOLD_MAX_EXPONENT:
+            raise ValueError("exponent too large")
+    elif isinstance(op, ast.Mult):
+        for seq, count in ((left, right), (right, left)):
+            if isinstance(seq, (str, bytes)) and isinstance(count, int):
+                if len(seq) * count > _FOLD_MAX_SIZE:
+                    raise ValueError("sequence too large")
+    return _FOLD_BINOPS[type(op)](left, right)
+
+
+def _fold_node(node: ast.AST) -> Any:
+    """尝试计算操作数均为常量的节点
+
+    Returns:
+        计算结果
+
+    Raises:
+        Exception: 节点不可折叠或计算失败（保留原节点，错误留到求值时报告）
+    """
+    if isinstance(node, ast.BinOp):
+        if isinstance(node.left, ast.Constant) and isinstance(node.right, ast.Constant):
+            return _fold_binop(node.op, node.left.value, node.right.value)
+    elif isinstance(node, ast.UnaryOp):
+        if isinstance(node.operand, ast.Constant):
+            return _FOLD_UNARYOPS[type(node.op)](node.operand.value)
+    elif isinstance(node, ast.Compare):
+        operands = [node.left, *node.comparators]
+        if all(isinstance(operand, ast.Constant) for operand in operands):
+            for op, left, right in zip(node.ops, operands, operands[1:], strict=False):
+                if not _FOLD_CMPOPS[type(op)](left.value, right.value):
+                    return False
+            return True
+    elif isinstance(node, ast.BoolOp):
+        if all(isinstance(value, ast.Constant) for value in node.values):
+            # 与求值器一致：and/or 的结果为布尔值
+            truths = [bool(value.value) for value in node.values]
+            return all(truths) if isinstance(node.op, ast.And) else any(truths)
+    raise ValueError("not foldable")
+
+
+def fold_constants(node: ast.AST) -> ast.AST:
+    """常量折叠：将操作数全为常量的运算替换为 Constant 节点
+
+    只折叠运算符、比较和布尔运算，不折叠函数调用（函数可被用户注册覆盖）。
+    不修改传入的 AST（它可能来自 parse_cached 的共享缓存），
+    发生变化的节点会被浅拷贝；计算出错或结果过大的子树保持原样。
+
+    Args:
+        node: AST 节点
+
+    Returns:
+        折叠后的 AST 节点（没有可折叠内容时返回原节点）
+    """
+    changes: dict[str, Any] = {}
+    for name, value in ast.iter_fields(node):
+        if isinstance(value, ast.AST):
+            folded = fold_constants(value)
+            if folded is not value:
+                changes[name] = folded
+        elif isinstance(value, list):
+            folded_list = [
+                fold_constants(item) if isinstance(item, ast.AST) else item for item in value
+            ]
+            if any(new is not old for new, old in zip(folded_list, value, strict=True)):
+                changes[name] = folded_list
+
+    if changes:
+        node = copy.copy(node)
+        for name, value in changes.items():
+            setattr(node, name, value)
+
+    if isinstance(node, (ast.BinOp, ast.UnaryOp, ast.Compare, ast.BoolOp)):
+        try:
+            value = _fold_node(node)
+        except Exception:
+            return node
+        if _foldable_value(value):
+            return ast.copy_location(ast.Constant(value=value), node)
+    return node
+
+
 # ============================================================
 # 解析结果
 # ============================================================
@@ -77,15 +242,20 @@ class ExpressionAnalyzer(ast.NodeVisitor):
 
     def visit_Call(self, node: ast.Call) -> None:
         """访问函数调用节点"""
-        # 获取函数名
-        if isinstance(node.func, ast.Name):
-            self.functions.add(node.func.id)
-            # 从变量集中移除（如果存在）
-            self.variables.discard(node.func.id)
-        elif isinstance(node.func, ast.Attribute):
-            # 方法调用，如 obj.method()
-            self.functions.add(node.func.attr)
-        self.generic_visit(node)
+        # 获取函数名；被调用的名称不经过 visit_Name，其他位置作为变量使用时仍会被记录
+        func = node.func
+        if isinstance(func, ast.Name):
+            self.functions.add(func.id)
+        elif isinstance(func, ast.Attribute):
+            # 方法调用，如 obj.method()：只访问被调用的对象
+            self.functions.add(func.attr)
+            self.visit(func.value)
+        else:
+            self.visit(func)
+        for arg in node.args:
+            self.visit(arg)
+        for keyword in node.keywords:
+            self.visit(keyword)
 
     def analyze(self, tree: ast.AST) -> tuple[list[str], list[str]]:
         """分析 AST 树
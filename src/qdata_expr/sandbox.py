@@ -22,11 +22,13 @@
 """
 
 import ast
+import builtins
 from collections.abc import Callable
 from dataclasses import dataclass, field
 from typing import Any
 
 from .exceptions import ForbiddenAccessError, SecurityViolationError
+from .parser import parse_cached
 
 # ============================================================
 # 安全配置
@@ -225,6 +227,41 @@ DEFAULT_SANDBOX_CONFIG = SandboxConfig()
 # ============================================================
 
 
+# 没有需要检查的子节点的节点类型（常量、上下文标记和运算符）
+_LEAF_NODE_TYPES = (
+    ast.Constant,
+    ast.expr_context,
+    ast.operator,
+    ast.unaryop,
+    ast.cmpop,
+    ast.boolop,
+)
+
+
+# 检查器类 -> {节点类型: 处理方法名}，按类缓存
+_VISITOR_NAMES: dict[type, dict[type, str]] = {}
+
+
+def _visitor_names(cls: type) -> dict[type, str]:
+    """收集检查器类（含子类新增或覆盖）的 visit_* 方法
+
+    NodeVisitor 自带的兼容方法（如 visit_Constant）不计入，未覆盖时仍走 generic_visit。
+    """
+    names = _VISITOR_NAMES.get(cls)
+    if names is None:
+        names = {}
+        for attr in dir(cls):
+            if not attr.startswith("visit_"):
+                continue
+            node_type = getattr(ast, attr[6:], None)
+            if isinstance(node_type, type) and getattr(cls, attr) is not getattr(
+                ast.NodeVisitor, attr, None
+            ):
+                names[node_type] = attr
+        _VISITOR_NAMES[cls] = names
+    return names
+
+
 class SafetyChecker(ast.NodeVisitor):
     """AST 安全检查器
 
@@ -234,6 +271,24 @@ class SafetyChecker(ast.NodeVisitor):
     def __init__(self, config: SandboxConfig | None = None):
         self.config = config or DEFAULT_SANDBOX_CONFIG
         self.errors: list[str] = []
+        # 直接持有禁止名称集合（与配置共享同一对象），每个名称只需一次哈希查找
+        self._forbidden_names = self.config.forbidden_names
+        # 节点类型 -> 处理方法，替代 NodeVisitor.visit 中按类名拼接的 getattr 查找
+        visitors = _visitor_names(type(self))
+        self._dispatch: dict[type, Callable[[Any], None]] = {
+            node_type: getattr(self, name) for node_type, name in visitors.items()
+        }
+        # 遍历时跳过的叶子节点类型，有处理方法的类型除外
+        self._leaf_types = tuple(
+            leaf
+            for leaf in _LEAF_NODE_TYPES
+            if not any(issubclass(node_type, leaf) for node_type in visitors)
+        )
+        # 简单表达式捷径直接检查变量名，子类覆盖 visit_Name 或新增处理方法时不可使用
+        self._use_shortcut = (
+            type(self).visit_Name is SafetyChecker.visit_Name
+            and visitors.keys() == _visitor_names(SafetyChecker).keys()
+        )
 
     def check(self, expression: str) -> list[str]:
         """检查表达式安全性
@@ -244,21 +299,76 @@ class SafetyChecker(ast.NodeVisitor):
         Returns:
             错误列表，空列表表示安全
         """
-        self.errors = []
         try:
-            tree = ast.parse(expression, mode="eval")
-            self.visit(tree)
+            tree = parse_cached(expression)
         except SyntaxError as e:
-            self.errors.append(f"语法错误: {e}")
+            self.errors = [f"语法错误: {e}"]
+            return self.errors
+        return self.check_tree(tree)
+
+    def check_tree(self, tree: ast.AST) -> list[str]:
+        """检查已解析的 AST
+
+        Args:
+            tree: AST 节点
+
+        Returns:
+            错误列表，空列表表示安全
+        """
+        self.errors = []
+        operands = self._simple_operands(tree) if self._use_shortcut else None
+        if operands is not None:
+            # 简单表达式只有变量名需要检查，跳过完整遍历
+            for operand in operands:
+                if isinstance(operand, ast.Name):
+                    self._check_name(operand.id)
+            return self.errors
+        self.visit(tree)
         return self.errors
 
+    @staticmethod
+    def _simple_operands(tree: ast.AST) -> tuple[ast.expr, ...] | None:
+        """获取简单表达式（单个变量/常量，或二者之间的二元运算）的操作数
+
+        Returns:
+            操作数元组，不是简单表达式时返回 None
+        """
+        body = tree.body if isinstance(tree, ast.Expression) else tree
+        if isinstance(body, ast.BinOp):
+            operands = (body.left, body.right)
+        else:
+            operands = (body,)
+        for operand in operands:
+            if not isinstance(operand, (ast.Name, ast.Constant)):
+                return None
+        return operands
+
+    def visit(self, node: ast.AST) -> None:
+        """按节点类型查表分派"""
+        handler = self._dispatch.get(type(node))
+        if handler is not None:
+            handler(node)
+        else:
+            self.generic_visit(node)
+
+    def generic_visit(self, node: ast.AST) -> None:
+        """遍历子节点，跳过不可能包含名称的叶子节点"""
+        visit = self.visit
+        leaf_types = self._leaf_types
+        for child in ast.iter_child_nodes(node):
+            if not isinstance(child, leaf_types):
+                visit(child)
+
     def visit_Name(self, node: ast.Name) -> None:
         """检查名称访问"""
-        name = node.id
-        if name in self.config.forbidden_names:
-            self.errors.append(f"禁止访问名称: {name}")
+        self._check_name(node.id)
         self.generic_visit(node)
 
+    def _check_name(self, name: str) -> None:
+        """检查名称是否被禁止"""
+        if name in self._forbidden_names:
+            self.errors.append(f"禁止访问名称: {name}")
+
     def visit_Attribute(self, node: ast.Attribute) -> None:
         """检查属性访问"""
         attr = node.attr
@@ -282,7 +392,7 @@ class SafetyChecker(ast.NodeVisitor):
         elif isinstance(node.func, ast.Attribute):
             func_name = node.func.attr
 
-        if func_name and func_name in self.config.forbidden_names:
+        if func_name and func_name in self._forbidden_names:
             self.errors.append(f"禁止调用函数: {func_name}")
 
         self.generic_visit(node)
@@ -342,7 +452,6 @@ class SafeNameResolver:
 
         # 检查允许的内置名称
         if name in self.config.allowed_builtins:
-            import builtins
             return getattr(builtins, name, None)
 
         # 未找到
@@ -499,6 +608,17 @@ class Sandbox:
         """
         return self._checker.check(expression)
 
+    def check_tree(self, tree: ast.AST) -> list[str]:
+        """检查已解析的 AST 的安全性
+
+        Args:
+            tree: AST 节点
+
+        Returns:
+            错误列表，空列表表示安全
+        """
+        return self._checker.check_tree(tree)
+
     def is_safe(self, expression: str) -> bool:
         """检查表达式是否安全
 
@@ -526,6 +646,23 @@ class Sandbox:
                 expression,
             )
 
+    def validate_tree(self, tree: ast.AST, expression: str = "") -> None:
+        """验证已解析的 AST 的安全性
+
+        Args:
+            tree: AST 节点
+            expression: 原始表达式（用于错误信息）
+
+        Raises:
+            SecurityViolationError: 表达式不安全时抛出
+        """
+        errors = self.check_tree(tree)
+        if errors:
+            raise SecurityViolationError(
+                f"表达式安全检查失败: {'; '.join(errors)}",
+                expression,
+            )
+
     def create_resolver(
         self,
         names: dict[str, Any] | None = None,
@@ -569,7 +706,6 @@ class Sandbox:
 
         # 添加安全的内置函数
         if include_builtins:
-            import builtins
             for name in self.config.allowed_builtins:
                 if hasattr(builtins, name):
                     safe_names[name] = getattr(builtins, name)
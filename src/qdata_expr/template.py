@@ -17,7 +17,9 @@
 - 与表达式引擎的集成
 """
 
+import re
 from collections.abc import Callable
+from functools import lru_cache
 from typing import Any
 
 from .exceptions import TemplateParseError, TemplateRenderError
@@ -48,6 +50,29 @@ except ImportError:
     meta = None  # type: ignore
 
 
+# dict 自身的属性名（如 items、keys），这些名称必须保持 Jinja2 原有的属性优先语义
+_DICT_ATTRIBUTES = frozenset(dir(dict))
+
+if HAS_JINJA2:
+
+    class _DictFastEnvironment(Environment):  # type: ignore[misc,valid-type]
+        """对普通字典的属性访问走快速路径的 Jinja2 环境
+
+        Jinja2 对 ``row.name`` 先尝试 getattr，失败后再按键取值；
+        对字典而言每次都会先抛出并捕获一次 AttributeError。
+        循环渲染数据行时这是主要开销，这里对普通字典直接按键取值，
+        与 dict 方法同名的键仍走 Jinja2 原有逻辑，结果保持一致。
+        """
+
+        def getattr(self, obj: Any, attribute: str) -> Any:
+            if type(obj) is dict and attribute not in _DICT_ATTRIBUTES:
+                try:
+                    return obj[attribute]
+                except KeyError:
+                    pass
+            return super().getattr(obj, attribute)
+
+
 # ============================================================
 # 简化模板引擎（无 Jinja2 依赖）
 # ============================================================
@@ -60,16 +85,13 @@ class SimpleTemplateEngine:
     仅支持基本的变量替换 {{ variable }}。
     """
 
-    import re as _re
-
-    VARIABLE_PATTERN = _re.compile(r'\{\{\s*([a-zA-Z_][a-zA-Z0-9_.]*)\s*\}\}')
+    VARIABLE_PATTERN = re.compile(r'\{\{\s*([a-zA-Z_][a-zA-Z0-9_.]*)\s*\}\}')
 
     def __init__(self) -> None:
         self._filters: dict[str, Callable] = {}
 
     def render(self, template: str, context: dict[str, Any] | None = None) -> str:
         """渲染模板"""
-        import re
         context = context or {}
 
         def replace(match: re.Match) -> str:  # type: ignore[type-arg]
@@ -106,6 +128,14 @@ class SimpleTemplateEngine:
 # ============================================================
 
 
+def _truncate(value: Any, length: int, end: str = "...") -> str:
+    """截断过滤器：超过 length 时截断并追加 end（只做一次字符串转换）"""
+    text = str(value)
+    if len(text) > length:
+        return text[:length - len(end)] + end
+    return text
+
+
 class Jinja2TemplateEngine:
     """Jinja2 模板引擎
 
@@ -130,23 +160,24 @@ class Jinja2TemplateEngine:
         result = engine.render(template, {"active": True})
     """
 
-    def __init__(self, strict_undefined: bool = False):
+    def __init__(self, strict_undefined: bool = False, cache_size: int = 256):
         """初始化引擎
 
         Args:
             strict_undefined: 是否使用严格的未定义变量处理
+            cache_size: 编译后模板的缓存大小
         """
         if not HAS_JINJA2:
             raise ImportError("Jinja2 is required for Jinja2TemplateEngine")
 
         if strict_undefined:
-            self._env = Environment(
+            self._env = _DictFastEnvironment(
                 loader=BaseLoader(),
                 autoescape=False,
                 undefined=StrictUndefined,
             )
         else:
-            self._env = Environment(
+            self._env = _DictFastEnvironment(
                 loader=BaseLoader(),
                 autoescape=False,
             )
@@ -154,6 +185,18 @@ class Jinja2TemplateEngine:
         # 注册内置过滤器
         self._register_builtin_filters()
 
+        # Jinja2 将模板编译为 Python 函数，按模板字符串缓存编译结果，
+        # 重复渲染时不再重新词法分析、解析和生成代码
+        # 解析结果（AST）单独缓存：validate 和 get_variables 只需要 AST，
+        # 不会触发代码生成；首次渲染时直接复用已解析的 AST 进行编译
+        self._cache_size = cache_size
+        self._parse = lru_cache(maxsize=cache_size)(self._env.parse)
+        self._compile = lru_cache(maxsize=cache_size)(self._compile_template)
+
+    def _compile_template(self, template: str) -> Any:
+        """编译模板（复用缓存的 AST）"""
+        return self._env.from_string(self._parse(template))
+
     def _register_builtin_filters(self) -> None:
         """注册内置过滤器"""
         import json
@@ -169,7 +212,7 @@ class Jinja2TemplateEngine:
             "default_if_empty": lambda v, d="": d if not v else v,
 
             # 字符串
-            "truncate": lambda s, l, e="...": str(s)[:l - len(e)] + e if len(str(s)) > l else str(s),
+            "truncate": _truncate,
             "upper": lambda s: str(s).upper(),
             "lower": lambda s: str(s).lower(),
             "title": lambda s: str(s).title(),
@@ -189,6 +232,8 @@ class Jinja2TemplateEngine:
             func: 过滤器函数
         """
         self._env.filters[name] = func
+        # 已编译的模板可能引用了同名的旧过滤器（AST 与过滤器无关，可继续复用）
+        self._compile = lru_cache(maxsize=self._cache_size)(self._compile_template)
 
     def render(self, template: str, context: dict[str, Any] | None = None) -> str:
         """渲染模板
@@ -203,8 +248,9 @@ class Jinja2TemplateEngine:
         context = context or {}
 
         try:
-            tpl = self._env.from_string(template)
-            return tpl.render(**context)
+            tpl = self._compile(template)
+            # 直接传入字典，避免 **context 解包再打包的额外拷贝
+            return tpl.render(context)
         except UndefinedError as e:
             raise TemplateRenderError(template, f"未定义的变量: {e}")
         except TemplateSyntaxError as e:
@@ -223,7 +269,7 @@ class Jinja2TemplateEngine:
         """
         errors = []
         try:
-            self._env.parse(template)
+            self._parse(template)
         except TemplateSyntaxError as e:
             errors.append(f"语法错误 (行 {e.lineno}): {e.message}")
         return errors
@@ -238,7 +284,7 @@ class Jinja2TemplateEngine:
             变量名列表
         """
         try:
-            ast = self._env.parse(template)
+            ast = self._parse(template)
             return sorted(meta.find_undeclared_variables(ast))
         except TemplateSyntaxError:
             return []
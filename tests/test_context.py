@@ -170,6 +170,27 @@ class TestContextResolver:
         # Should return unchanged context
         assert new_context == sample_context
 
+    def test_set_delete_copy_only_the_path(self):
+        """Test set/delete copy containers on the path and share the rest."""
+        resolver = ContextResolver()
+        context = {
+            "a": {"b": [1, {"c": 1}], "side": {"x": 1}},
+            "pair": ({"k": 1}, [2]),
+            "other": [3],
+        }
+
+        updated = resolver.set("a.b[1].c", 2, context)
+        assert updated["a"]["b"][1]["c"] == 2
+        assert context["a"]["b"][1]["c"] == 1
+        assert updated["a"] is not context["a"]
+        assert updated["a"]["side"] is context["a"]["side"]
+        assert updated["other"] is context["other"]
+
+        removed = resolver.delete("pair[0].k", context)
+        assert removed["pair"] == ({}, [2])
+        assert context["pair"] == ({"k": 1}, [2])
+        assert removed["pair"][1] is context["pair"][1]
+
     def test_merge_contexts(self, sample_context: dict):
         """Test context merging."""
         resolver = ContextResolver()
@@ -185,6 +206,64 @@ class TestContextResolver:
         # Original should be unchanged
         assert sample_context["user"]["name"] == "Alice"
 
+    def test_merge_copies_nested_values(self):
+        """Test merged results share no mutable state with the original."""
+
+        class Box:
+            def __init__(self, items):
+                self.items = items
+
+        resolver = ContextResolver()
+        context = {"rows": [[1, 2], ({"k": "v"},)], "box": Box([1])}
+
+        new_context = resolver.merge(context, {"extra": 1})
+        new_context["rows"][0].append(3)
+        new_context["rows"][1][0]["k"] = "changed"
+        new_context["box"].items.append(2)
+
+        assert context["rows"] == [[1, 2], ({"k": "v"},)]
+        assert context["box"].items == [1]
+
+        # 合并进来的可变值同样被拷贝
+        updates = {"rows": [[9]], "box": Box([5]), "name": "x"}
+        new_context = resolver.merge(context, updates)
+        new_context["rows"][0].append(0)
+        new_context["box"].items.append(6)
+        assert updates["rows"] == [[9]]
+        assert updates["box"].items == [5]
+        assert new_context["name"] == "x"
+
+    def test_merge_copies_shared_values_once(self):
+        """Test objects referenced several times in the context are copied once."""
+        from datetime import date
+
+        resolver = ContextResolver()
+        shared = {"start": date(2024, 1, 1), "tags": ["a"]}
+        context = {"a": {"cfg": shared}, "b": {"cfg": shared}}
+
+        new_context = resolver.merge(context, {"c": shared})
+        assert new_context["a"]["cfg"] is new_context["b"]["cfg"]
+        assert new_context["a"]["cfg"] is not shared
+        # 更新值单独拷贝，不与原上下文的拷贝共享
+        assert new_context["c"] == shared
+        assert new_context["c"] is not new_context["a"]["cfg"]
+
+        # 循环引用同样可以拷贝
+        loop: dict = {"name": "loop"}
+        loop["self"] = loop
+        copied = resolver.merge({"loop": loop}, {})["loop"]
+        assert copied["self"] is copied and copied is not loop
+
+    def test_merge_update_value_shared_with_context(self):
+        """Test an update value also present in the context is not merged into."""
+        resolver = ContextResolver()
+        d = {"k": 1}
+
+        result = resolver.merge({"a": d}, {"a": {"z": 2}, "b": d})
+        assert result == {"a": {"k": 1, "z": 2}, "b": {"k": 1}}
+        assert result["a"] is not result["b"]
+        assert d == {"k": 1}
+
     def test_flatten_context(self, sample_context: dict):
         """Test context flattening."""
         resolver = ContextResolver()
@@ -267,6 +346,38 @@ class TestContextResolver:
         result = resolver.resolve("order.items[0].name", sample_context)
         assert result == "Laptop"
 
+    def test_resolve_cached_accessor_per_path(self):
+        """Test cached path accessors do not capture the context."""
+        resolver = ContextResolver()
+
+        assert resolver.resolve("a.b", {"a": {"b": 1}}) == 1
+        assert resolver.resolve("a.b", {"a": {"b": 2}}) == 2
+        assert resolver.resolve("a.b", {"a": {}}, "d") == "d"
+        assert resolver.resolve("...", {"a": 1}, "d") == "d"
+
+    def test_resolve_type_rules(self):
+        """Test resolution only indexes sequences and falls back to attributes."""
+
+        class Obj:
+            name = "obj"
+
+        resolver = ContextResolver()
+        context = {
+            "text": "abc",
+            "by_int": {0: "zero"},
+            "obj": Obj(),
+            "none": None,
+            "quoted": {"it's": 1},
+        }
+
+        assert resolver.resolve("text[0]", context, "d") == "d"
+        assert resolver.resolve("by_int[0]", context, "d") == "d"
+        assert resolver.resolve("obj.name", context) == "obj"
+        assert resolver.resolve("obj.missing", context, "d") == "d"
+        assert resolver.resolve("none.x", context, "d") == "d"
+        assert resolver.resolve("none", context, "d") is None
+        assert resolver.resolve("quoted[\"it's\"]", context) == 1
+
 
 class TestPathParser:
     """Test PathParser class."""
@@ -307,6 +418,38 @@ class TestPathParser:
         parts = parser.parse('data["key"]')
         assert parts == ["data", "key"]
 
+    def test_parse_tuple_cached(self):
+        """Test parsed paths are cached as tuples and parse returns fresh lists."""
+        from qdata_expr.context import PathParser
+
+        parts = PathParser.parse_tuple("users[0].address.city")
+        assert parts == ("users", 0, "address", "city")
+        assert PathParser.parse_tuple("users[0].address.city") is parts
+
+        other = PathParser.parse_tuple("admins['address']")
+        assert other[1] is parts[2]
+
+        first = PathParser.parse("users[0].address.city")
+        first.append("mutated")
+        assert PathParser.parse("users[0].address.city") == ["users", 0, "address", "city"]
+
+    def test_custom_path_pattern(self):
+        """Test a subclass overriding PATH_PATTERN is used for parsing."""
+        import re
+
+        from qdata_expr.context import PathParser
+
+        class DashedPathParser(PathParser):
+            # 键名允许包含连字符
+            PATH_PATTERN = re.compile(
+                r"\.?([a-zA-Z_][a-zA-Z0-9_-]*)|\[(\d+)\]|\['([^']+)'\]|\[\"([^\"]+)\"\]"
+            )
+
+        assert DashedPathParser.parse("user-info.first-name") == ["user-info", "first-name"]
+        assert DashedPathParser.parse("rows[2]['a b']") == ["rows", 2, "a b"]
+        # 基类不受影响
+        assert PathParser.parse("user-info.first-name") == ["user", "info", "first", "name"]
+
     def test_build_path(self):
         """Test building paths from parts."""
         from qdata_expr.context import PathParser
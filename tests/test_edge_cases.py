@@ -518,3 +518,21 @@ class TestErrorMessages:
 
         # Error should mention the variable name
         assert "undefined_var" in str(exc_info.value)
+
+
+class TestPackageExports:
+    """Test the package-level exports."""
+
+    def test_all_exports_resolve(self):
+        """Test every name in __all__ is declared once and resolves lazily."""
+        import qdata_expr
+
+        lazy = set(qdata_expr._LAZY_IMPORTS)
+        assert len(qdata_expr.__all__) == len(set(qdata_expr.__all__))
+        assert lazy <= set(qdata_expr.__all__)
+
+        for name in qdata_expr.__all__:
+            assert getattr(qdata_expr, name) is not None
+
+        with pytest.raises(AttributeError):
+            qdata_expr.does_not_exist  # noqa: B018
@@ -12,6 +12,7 @@ from qdata_expr import (
     ExpressionEvalError,
     ExpressionParseError,
     SafeEvaluator,
+    SecurityViolationError,
     UndefinedFunctionError,
     UndefinedVariableError,
     evaluate,
@@ -281,6 +282,21 @@ class TestExpressionEngine:
         variables = expression_engine.get_variables("2 + 3 * 4")
         assert len(variables) == 0
 
+        # 被调用的未知名称在其他位置作为变量使用时仍是变量
+        assert expression_engine.get_variables("f + f(x)") == ["f", "x"]
+
+    def test_get_variables_cached(self, expression_engine: ExpressionEngine):
+        """Test cached variable extraction follows function registration."""
+        variables = expression_engine.get_variables("rate * amount")
+        variables.append("mutated")
+        assert expression_engine.get_variables("rate * amount") == ["amount", "rate"]
+
+        expression_engine.register_function("rate", lambda: 0.1)
+        assert expression_engine.get_variables("rate * amount") == ["amount"]
+
+        expression_engine.unregister_function("rate")
+        assert expression_engine.get_variables("rate * amount") == ["amount", "rate"]
+
     def test_cache_functionality(self, expression_engine: ExpressionEngine):
         """Test expression caching."""
         # First evaluation
@@ -302,6 +318,153 @@ class TestExpressionEngine:
             stats_after = expression_engine.cache_stats
             assert stats_after["size"] == 0
 
+    def test_cache_reused_across_contexts(self, expression_engine: ExpressionEngine):
+        """Test repeated expressions hit the compiled-expression cache."""
+        assert expression_engine.evaluate("x + y", {"x": 1, "y": 2}) == 3
+        assert expression_engine.evaluate("x + y", {"x": 10, "y": 20}) == 30
+
+        stats = expression_engine.cache_stats
+        assert stats["size"] == 1
+        assert stats["misses"] == 1
+        assert stats["hits"] == 1
+
+    def test_context_not_copied_or_mutated(self, expression_engine: ExpressionEngine):
+        """Test math constants are a fallback and the context stays untouched."""
+        context = {"nums": [1, 2, 3]}
+        assert expression_engine.evaluate("[x * 2 for x in nums]", context) == [2, 4, 6]
+        assert expression_engine.evaluate("{k: k for k in nums}", context) == {1: 1, 2: 2, 3: 3}
+        assert context == {"nums": [1, 2, 3]}
+
+        assert expression_engine.evaluate("r * 2 * pi", {"r": 1}) == pytest.approx(6.283185)
+        assert expression_engine.evaluate("e + 1", {"e": 1}) == 2
+        assert expression_engine.evaluate("pi") == pytest.approx(3.141593)
+
+    def test_nested_evaluation_reuses_pool_safely(self):
+        """Test a function that evaluates another expression does not clobber the caller."""
+        engine = ExpressionEngine()
+        engine.register_function(
+            "inner", lambda v: engine.evaluate("v * 10 + w if v else 0", {"v": v, "w": 1})
+        )
+
+        assert engine.evaluate("inner(a) + a + b", {"a": 2, "b": 3}) == 26
+        assert engine.evaluate("[inner(x) for x in nums]", {"nums": [1, 2]}) == [11, 21]
+
+    def test_builtin_functions_isolated_per_engine(self):
+        """Test engines share built-ins without sharing later registry changes."""
+        engine = ExpressionEngine()
+        other = ExpressionEngine()
+        assert engine.evaluate("abs(x)", {"x": -1}) == 1
+
+        assert engine.unregister_function("abs")
+        assert not engine.has_function("abs")
+        assert other.has_function("abs")
+        assert other.evaluate("abs(x)", {"x": -1}) == 1
+
+    def test_cache_bounded(self):
+        """Test the compile cache stays bounded under many unique expressions."""
+        engine = ExpressionEngine(cache_size=8)
+        for i in range(40):
+            assert engine.evaluate(f"x + {i}", {"x": 1}) == i + 1
+
+        stats = engine.cache_stats
+        assert stats["size"] == 8
+        assert stats["misses"] == 40
+
+        # 命中不会重新编译
+        engine.evaluate("x + 39", {"x": 1})
+        assert engine.cache_stats["hits"] == 1
+
+        engine.clear_cache()
+        assert engine.cache_stats["size"] == 0
+
+    def test_lru_cache_concurrent_access(self):
+        """Test the lock-free LRU cache stays bounded and consistent across threads."""
+        import threading
+
+        from qdata_expr.evaluator import LRUCache
+
+        cache = LRUCache(max_size=32)
+
+        def worker(offset: int) -> None:
+            for i in range(2000):
+                key = str((i + offset) % 100)
+                hit, value = cache.get(key)
+                if hit:
+                    assert value == key
+                else:
+                    cache.put(key, key)
+
+        threads = [threading.Thread(target=worker, args=(n * 7,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(cache._cache) <= 32
+        cache.put("a", 1)
+        cache.put("a", 2)
+        assert cache.get("a") == (True, 1)
+
+        small = LRUCache(max_size=2)
+        for key in ("x", "y", "z"):
+            small.put_new(key, key)
+        assert list(small._cache) == ["y", "z"]
+
+    def test_unsafe_expression_not_cached(self, expression_engine: ExpressionEngine):
+        """Test sandbox rejections are raised on every call, never cached."""
+        for _ in range(2):
+            with pytest.raises(SecurityViolationError):
+                expression_engine.evaluate("eval('1+1')")
+        assert expression_engine.cache_stats["size"] == 0
+
+    def test_engine_evaluate_many(self, expression_engine: ExpressionEngine):
+        """Test evaluating several expressions against one context."""
+        context = {"x": 2}
+        assert expression_engine.evaluate_many(["x + 1", "x * pi", "abs(-x)"], context) == [
+            3,
+            pytest.approx(6.283185),
+            2,
+        ]
+
+        with pytest.raises(SecurityViolationError):
+            expression_engine.evaluate_many(["x", "eval('1')"], context)
+
+        results = expression_engine.evaluate_many(
+            ["eval('1')", "missing", "x"], context, return_exceptions=True
+        )
+        assert isinstance(results[0], SecurityViolationError)
+        assert isinstance(results[1], ExpressionEvalError)
+        assert results[2] == 2
+
+    def test_engine_compile(self, expression_engine: ExpressionEngine):
+        """Test ExpressionEngine.compile returns the cached instance."""
+        compiled = expression_engine.compile("a * 2")
+        assert isinstance(compiled, CompiledExpression)
+        assert expression_engine.compile("a * 2") is compiled
+
+    def test_equivalent_expressions_share_compilation(
+        self, expression_engine: ExpressionEngine
+    ):
+        """Test whitespace-only variants reuse the compiled expression."""
+        first = expression_engine.compile("x+y")
+        second = expression_engine.compile("x + y")
+        assert second.expression == "x + y"
+        assert second.ast_node is first.ast_node
+
+        # Constants of different types must not be merged
+        assert expression_engine.evaluate("x + 1", {"x": 1}) == 2
+        assert isinstance(expression_engine.evaluate("x + 1.0", {"x": 1}), float)
+        assert expression_engine.evaluate("x + True", {"x": 1}) == 2
+        float_add = expression_engine.compile("x + 1.0")
+        assert float_add.ast_node is not expression_engine.compile("x+1").ast_node
+
+    def test_engine_syntax_error(self):
+        """Test syntax errors with and without the sandbox."""
+        with pytest.raises(SecurityViolationError, match="语法错误"):
+            ExpressionEngine(enable_sandbox=True).evaluate("1 +")
+        with pytest.raises(ExpressionEvalError):
+            ExpressionEngine(enable_sandbox=False).evaluate("1 +")
+
 
 class TestCompiledExpression:
     """Test CompiledExpression class."""
@@ -323,6 +486,139 @@ class TestCompiledExpression:
         result = compiled.evaluate({"x": 10, "y": 20})
         assert result == 30
 
+    def test_compiled_names(self):
+        """Test variables and functions are collected at compile time."""
+        compiled = CompiledExpression.compile("upper(name) + str(user.id) if flag else ''")
+        assert compiled.variables == ["flag", "name", "user"]
+        assert compiled.functions == ["str", "upper"]
+
+    def test_lowered_ops_match_interpreter(self):
+        """Test the flat instruction stream agrees with the AST interpreter."""
+        from qdata_expr.functions.logic_funcs import expr_if_else
+
+        context = {"a": 3, "b": -2, "u": {"x": 1, "y": [1, 2]}, "items": [5, 6]}
+        functions = {"abs": abs, "max": max, "if_else": expr_if_else}
+        expressions = [
+            "abs(a - b) + max(a, u.x, key=None)",
+            "u.y[1] if a > b and not u.x == 2 else items[0]",
+            "if_else(a < 0, missing, [a, (b, u['x'])])",
+            "a < b < u.x or {'k': a}['k'] in items",
+            "[i * 2 for i in items if i > a][-1]",
+        ]
+        for expression in expressions:
+            compiled = CompiledExpression.compile(expression)
+            assert compiled.ops is not None
+            evaluator = SafeEvaluator(names=context, functions=functions)
+            expected = evaluator.eval_tree(compiled.ast_node, expression)
+            assert compiled.evaluate(context, functions) == expected
+
+        # 函数在参数之前查找，报错与解释器一致
+        with pytest.raises(ExpressionEvalError, match="nofn"):
+            CompiledExpression.compile("nofn(missing)").evaluate({}, functions)
+
+    def test_lowered_name_slots(self):
+        """Test names in the instruction stream resolve once per evaluation, in lookup order."""
+        compiled = CompiledExpression.compile("a > 1 and a < b.x or abs(a) == pi")
+        assert compiled.slots == ("a", "b", "pi")
+
+        context = {"a": 2, "b": {"x": 5}}
+        assert compiled.evaluate(context, {"abs": abs}, {"pi": 2}) is True
+        # 函数优先于同名变量，常量只在变量缺失时使用
+        shadowed = CompiledExpression.compile("[a, pi]")
+        assert shadowed.evaluate({"a": 2, "pi": 0}, {"a": abs}, {"pi": 1}) == [abs, 0]
+        assert shadowed.evaluate({"a": 2}, {}, {"pi": 1}) == [2, 1]
+        # 未定义的名称只有执行到时才报错
+        lazy = CompiledExpression.compile("a if a > 0 else missing")
+        assert lazy.evaluate({"a": 1}) == 1
+        with pytest.raises(ExpressionEvalError, match="missing"):
+            lazy.evaluate({"a": 0})
+
+    def test_trivial_expressions(self):
+        """Test literals, single names and attribute paths skip the analysis passes."""
+        context = {"x": 1, "user": {"profile": {"name": "Ann"}}}
+
+        literal = CompiledExpression.compile("42")
+        assert literal.constant == 42 and literal.evaluate() == 42
+        assert CompiledExpression.compile("1 < 2 < 3").constant is True
+        # 可变的字面量每次求值都是新对象
+        mutable = CompiledExpression.compile("[1]")
+        mutable.evaluate().append(2)
+        assert mutable.evaluate() == [1]
+
+        name = CompiledExpression.compile("x")
+        assert name.native_args == ("x",)
+        assert name.evaluate(context) == 1
+
+        path = CompiledExpression.compile("user.profile.name")
+        assert path.variables == ["user"]
+        assert path.slots == ("user",)
+        assert path.evaluate(context) == "Ann"
+        with pytest.raises(ExpressionEvalError, match="user"):
+            path.evaluate({})
+
+    def test_native_fast_path(self):
+        """Test pure-operator expressions compile to a native function."""
+        compiled = CompiledExpression.compile("x + y * 2 - -z")
+        assert compiled.native is not None
+        assert compiled.native_args == ("x", "y", "z")
+        assert compiled.evaluate({"x": 1, "y": 2, "z": 3}) == 8
+
+        # 调用、属性、比较等不走原生路径
+        assert CompiledExpression.compile("abs(x)").native is None
+        assert CompiledExpression.compile("a.b + 1").native is None
+        assert CompiledExpression.compile("x > 1").native is None
+
+    def test_native_fast_path_errors(self):
+        """Test the native path reports the same errors as the interpreter."""
+        compiled = CompiledExpression.compile("x / y")
+        with pytest.raises(ExpressionEvalError, match="y"):
+            compiled.evaluate({"x": 1})
+        with pytest.raises(ExpressionEvalError):
+            compiled.evaluate({"x": 1, "y": 0})
+
+        # 函数名优先于同名变量
+        shadowed = CompiledExpression.compile("max + 1")
+        with pytest.raises(ExpressionEvalError):
+            shadowed.evaluate({"max": 1}, {"max": max})
+
+    def test_compiled_evaluation_with_functions(self):
+        """Test evaluating a compiled expression with a function mapping."""
+        compiled = CompiledExpression.compile("double(x) + 1")
+        result = compiled.evaluate({"x": 4}, {"double": lambda v: v * 2})
+        assert result == 9
+
+    def test_evaluate_many(self):
+        """Test batch evaluation over several contexts."""
+        compiled = CompiledExpression.compile("x + y")
+        contexts = [{"x": 1, "y": 2}, {"x": 3, "y": 4}]
+        assert compiled.evaluate_many(contexts) == [3, 7]
+        assert compiled.evaluate_many([]) == []
+
+        compiled = CompiledExpression.compile("double(x)")
+        results = compiled.evaluate_many(
+            [{"x": 1}, {"x": 2}], {"double": lambda v: v * 2}
+        )
+        assert results == [2, 4]
+
+        with pytest.raises(ExpressionEvalError):
+            CompiledExpression.compile("x + y").evaluate_many([{"x": 1, "y": 2}, {"x": 1}])
+
+    def test_compiled_path_lookup(self):
+        """Test pre-split attribute/subscript paths keep evaluator semantics."""
+        compiled = CompiledExpression.compile("order.items[0].name")
+        context = {"order": {"items": [{"name": "widget"}]}}
+        assert compiled.evaluate(context) == "widget"
+
+        # Missing dict keys resolve to None, like the tree-walking evaluator
+        assert CompiledExpression.compile("order.missing").evaluate(context) is None
+
+        # Non-constant subscripts fall back to node-by-node evaluation
+        compiled = CompiledExpression.compile("order.items[i].name")
+        assert compiled.evaluate({**context, "i": 0}) == "widget"
+
+        with pytest.raises(ExpressionEvalError):
+            CompiledExpression.compile("order.items[5].name").evaluate(context)
+
 
 class TestSafeEvaluator:
     """Test SafeEvaluator class."""
@@ -350,12 +646,43 @@ class TestSafeEvaluator:
         result = evaluator.eval("custom_func(5)")
         assert result == 10
 
+    def test_operators_annotated_and_unsupported(self):
+        """Test precomputed operators match lookups and unknown ones still fail."""
+        context = {"a": -1, "b": 2, "c": 3}
+        compiled = CompiledExpression.compile("abs(a) < b <= c")
+        assert compiled.evaluate(context, {"abs": abs}) is True
+        compiled = CompiledExpression.compile("-a + b * abs(c)")
+        assert compiled.evaluate(context, {"abs": abs}) == 7
+
+        with pytest.raises(ExpressionEvalError, match="MatMult"):
+            SafeEvaluator(names={"a": 1, "b": 2}).eval("a @ b")
+
+    def test_comprehension_scope_on_large_context(self):
+        """Test comprehensions over large read-only contexts shadow without copying."""
+        from types import MappingProxyType
+
+        names = {f"k{i}": i for i in range(200)}
+        names.update(x=100, items=[1, 2])
+        evaluator = SafeEvaluator(names=MappingProxyType(names))
+
+        result = evaluator.eval("[[x + y + k1 for y in items] for x in items]")
+        assert result == [[3, 4], [4, 5]]
+        assert evaluator.eval("{x: k2 for x in items}") == {1: 2, 2: 2}
+        assert evaluator.eval("x") == 100
+        assert "y" not in names
+
     def test_safe_evaluator_error_handling(self):
         """Test SafeEvaluator error handling."""
         evaluator = SafeEvaluator()
         with pytest.raises(ExpressionEvalError):
             evaluator.eval("undefined_var")
 
+    def test_safe_evaluator_unsupported_node(self):
+        """Test unsupported node types are rejected by the dispatcher."""
+        evaluator = SafeEvaluator()
+        with pytest.raises(ExpressionEvalError, match="Lambda"):
+            evaluator.eval("lambda: 1")
+
 
 class TestConvenienceFunctions:
     """Test convenience functions."""
@@ -395,6 +722,13 @@ class TestConvenienceFunctions:
         engine2 = get_default_engine()
         assert engine is engine2
 
+    def test_evaluate_function_uses_cache(self):
+        """Test repeated convenience calls reuse the default engine's cache."""
+        compiled = get_default_engine().compile("a * 3 + b")
+        assert evaluate("a * 3 + b", {"a": 1, "b": 2}) == 5
+        assert evaluate("a * 3 + b", {"a": 2, "b": 0}) == 6
+        assert get_default_engine().compile("a * 3 + b") is compiled
+
 
 class TestPerformance:
     """Performance tests."""
@@ -8,7 +8,7 @@ from datetime import datetime
 
 import pytest
 
-from qdata_expr import ExpressionEngine
+from qdata_expr import ExpressionEngine, ExpressionEvalError
 from qdata_expr.functions import (
     MATH_FUNCTIONS,
     STRING_FUNCTIONS,
@@ -418,6 +418,17 @@ class TestLogicFunctions:
         result = engine.evaluate("is_blank('hello')")
         assert not result
 
+    def test_if_else_short_circuit(self):
+        """Test if_else only evaluates the selected branch."""
+        engine = ExpressionEngine()
+
+        assert engine.evaluate("if_else(x > 0, 10 / x, 0)", {"x": 0}) == 0
+        assert engine.evaluate("if_else(x > 0, 10 / x, 0)", {"x": 5}) == 2
+
+        # A user-registered if_else keeps ordinary call semantics
+        engine.register_function("if_else", lambda cond, a, b: (cond, a, b))
+        assert engine.evaluate("if_else(1, 2, 3)") == (1, 2, 3)
+
     def test_conditional_functions(self):
         """Test conditional functions."""
         engine = ExpressionEngine()
@@ -768,6 +779,26 @@ class TestDateTimeFunctions:
         assert result.month == 1
         assert result.day == 15
 
+    def test_string_date_formats(self):
+        """Test string inputs pick the first matching format by priority."""
+        engine = ExpressionEngine()
+
+        cases = {
+            "2024-01-15 14:30:45": datetime(2024, 1, 15, 14, 30, 45),
+            "2024-01-15 14:30": datetime(2024, 1, 15, 14, 30),
+            "2024/01/15": datetime(2024, 1, 15),
+            "15/01/2024": datetime(2024, 1, 15),
+            "15-01-2024": datetime(2024, 1, 15),
+            "20240115": datetime(2024, 1, 15),
+            "20240115143045": datetime(2024, 1, 15, 14, 30, 45),
+        }
+        for _ in range(2):
+            for text, expected in cases.items():
+                assert engine.evaluate("date_format(d)", {"d": text}) == str(expected)
+
+        with pytest.raises(ExpressionEvalError):
+            engine.evaluate("date_format(d)", {"d": "2024.01.15"})
+
     def test_date_components(self):
         """Test date component functions."""
         engine = ExpressionEngine()
@@ -835,6 +866,27 @@ class TestDateTimeFunctions:
         result = engine.evaluate("start_of_month(date)", context)
         assert result.day == 1
 
+    def test_month_end_clamping(self):
+        """Test month arithmetic clamps to the month length, including leap years."""
+        engine = ExpressionEngine()
+
+        cases = [
+            (datetime(2024, 1, 31), 1, datetime(2024, 2, 29)),
+            (datetime(2023, 1, 31), 1, datetime(2023, 2, 28)),
+            (datetime(1900, 1, 31), 1, datetime(1900, 2, 28)),
+            (datetime(2000, 1, 31), 1, datetime(2000, 2, 29)),
+            (datetime(2024, 3, 31), -1, datetime(2024, 2, 29)),
+            (datetime(2024, 5, 31), 1, datetime(2024, 6, 30)),
+            (datetime(2024, 12, 31), 2, datetime(2025, 2, 28)),
+        ]
+        for date, months, expected in cases:
+            assert engine.evaluate("add_months(date, n)", {"date": date, "n": months}) == expected
+
+        result = engine.evaluate("end_of_month(date)", {"date": datetime(2100, 2, 1)})
+        assert result.day == 28
+        result = engine.evaluate("end_of_month(date)", {"date": datetime(2400, 2, 1)})
+        assert result.day == 29
+
 
 class TestFunctionRegistry:
     """Test FunctionRegistry class."""
@@ -951,6 +1003,57 @@ class TestFunctionRegistry:
         assert callables["f1"]() == 1
         assert callables["f2"]() == 2
 
+    def test_get_all_callables_cached(self):
+        """Test the internal callables view is reused until the registry changes."""
+        registry = FunctionRegistry()
+        registry.register("f1", lambda: 1, FunctionCategory.CUSTOM)
+
+        view = registry._callables_view()
+        assert registry._callables_view() is view
+        with pytest.raises(TypeError):
+            view["f2"] = len  # type: ignore[index]
+
+        # 公开接口每次返回可修改的新字典，不影响缓存
+        callables = registry.get_all_callables()
+        assert isinstance(callables, dict)
+        callables["f2"] = len
+        assert "f2" not in registry.get_all_callables()
+
+        registry.register("f2", lambda: 2, FunctionCategory.CUSTOM, aliases=["g"])
+        updated = registry._callables_view()
+        assert updated is not view
+        assert set(updated) == {"f1", "f2", "g"}
+
+        registry.unregister("f2")
+        assert set(registry.get_all_callables()) == {"f1"}
+
+    def test_validate_args(self):
+        """Test argument count validation with and without an upper bound."""
+        bounded = FunctionDefinition("f", len, FunctionCategory.CUSTOM, min_args=1, max_args=2)
+        assert not bounded.validate_args(())
+        assert bounded.validate_args((1,))
+        assert bounded.validate_args((1, 2))
+        assert not bounded.validate_args((1, 2, 3))
+
+        unbounded = FunctionDefinition("g", len, FunctionCategory.CUSTOM, min_args=1)
+        assert not unbounded.validate_args(())
+        assert unbounded.validate_args(tuple(range(100)))
+
+    def test_merge_into_empty_registry_shares_callables(self):
+        """Test merging into an empty registry reuses the source's callables mapping."""
+        source = FunctionRegistry()
+        source.register("f1", lambda: 1, FunctionCategory.CUSTOM, aliases=["g"])
+        view = source._callables_view()
+
+        target = FunctionRegistry()
+        target.merge(source)
+        assert target._callables_view() is view
+
+        # 变更后各自独立
+        target.register("f2", lambda: 2, FunctionCategory.CUSTOM)
+        assert set(target.get_all_callables()) == {"f1", "f2", "g"}
+        assert set(source.get_all_callables()) == {"f1", "g"}
+
     def test_function_aliases(self):
         """Test function aliases."""
         registry = FunctionRegistry()
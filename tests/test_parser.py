@@ -2,6 +2,7 @@
 Tests for expression parser.
 """
 
+import pytest
 
 from qdata_expr import (
     ExpressionAnalyzer,
@@ -263,6 +264,27 @@ class TestExpressionAnalyzer:
         assert "abs" in functions
         assert "round" in functions
 
+    def test_analyze_unknown_function_calls(self):
+        """Test called names are not reported as variables."""
+        import ast
+
+        analyzer = ExpressionAnalyzer()
+
+        tree = ast.parse("f(a) + g(b)", mode="eval")
+        variables, functions = analyzer.analyze(tree)
+
+        assert variables == ["a", "b"]
+        assert functions == ["f", "g"]
+
+        # 同一名称既被调用又作为变量使用时，两处都要记录
+        variables, functions = analyzer.analyze(ast.parse("f + f(x)", mode="eval"))
+        assert variables == ["f", "x"]
+        assert functions == ["f"]
+
+        variables, functions = analyzer.analyze(ast.parse("obj.m(a, k=b)", mode="eval"))
+        assert variables == ["a", "b", "obj"]
+        assert functions == ["m"]
+
     def test_analyze_method_calls(self):
         """Test analyzing method calls."""
         import ast
@@ -452,6 +474,35 @@ class TestConvenienceFunctions:
         assert "x" in variables
         assert "items" in variables
 
+    def test_parse_cached(self):
+        """Test the shared AST cache used by the engine and sandbox."""
+        from qdata_expr.parser import parse_cached
+
+        tree = parse_cached("price * qty")
+        assert parse_cached("price * qty") is tree
+
+        for _ in range(2):
+            with pytest.raises(SyntaxError):
+                parse_cached("price *")
+
+    def test_fold_constants(self):
+        """Test constant folding leaves the shared AST untouched."""
+        import ast
+
+        from qdata_expr.parser import fold_constants, parse_cached
+
+        tree = parse_cached("f(2 + 3 * 4, 1 < 2 < 0, x * (60 * 60), abs(-5))")
+        before = ast.dump(tree)
+        folded = fold_constants(tree)
+
+        assert ast.dump(tree) == before
+        assert ast.unparse(folded) == "f(14, False, x * 3600, abs(-5))"
+
+        # 出错或结果过大的运算保持原样，留到求值时处理
+        for expression in ("1 / 0", "'a' * 100000", "2 ** 1000"):
+            tree = parse_cached(expression)
+            assert fold_constants(tree) is tree
+
     def test_is_expression_function(self):
         """Test is_expression convenience function."""
         assert is_expression("${x + y}")
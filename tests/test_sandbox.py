@@ -6,6 +6,7 @@ import pytest
 
 from qdata_expr import (
     ForbiddenAccessError,
+    SafetyChecker,
     Sandbox,
     SandboxConfig,
     SecurityViolationError,
@@ -128,6 +129,80 @@ class TestSandbox:
             errors = sandbox.check_expression(expr)
             assert len(errors) > 0, f"Import statement should be blocked: {expr}"
 
+    def test_check_tree(self, sandbox: Sandbox):
+        """Test checking an already parsed AST."""
+        import ast
+
+        assert sandbox.check_tree(ast.parse("abs(-5)", mode="eval")) == []
+        errors = sandbox.check_tree(ast.parse("eval('1+1')", mode="eval"))
+        assert any("eval" in error for error in errors)
+
+        with pytest.raises(SecurityViolationError):
+            sandbox.validate_tree(ast.parse("__import__('os')", mode="eval"))
+
+    def test_checker_subclass_visitors(self):
+        """Test visitors added in a SafetyChecker subclass are dispatched."""
+        import ast
+
+        class StrictChecker(SafetyChecker):
+            def visit_Lambda(self, node: ast.Lambda) -> None:
+                self.errors.append("lambda forbidden")
+                self.generic_visit(node)
+
+            def visit_Constant(self, node: ast.Constant) -> None:
+                if isinstance(node.value, str):
+                    self.errors.append("string forbidden")
+
+        checker = StrictChecker()
+        errors = checker.check_tree(ast.parse("f(lambda x: x, 'a')", mode="eval"))
+        assert errors == ["lambda forbidden", "string forbidden"]
+        # 基类不受子类影响
+        assert SafetyChecker().check("f(lambda x: x, 'a')") == []
+
+    def test_check_simple_expressions(self, sandbox: Sandbox):
+        """Test the shortcut for single names and two-operand arithmetic."""
+        assert sandbox.check_expression("x + y") == []
+        assert sandbox.check_expression("2 * 3") == []
+        assert sandbox.check_expression("price") == []
+        assert sandbox.check_expression("globals") == ["禁止访问名称: globals"]
+        assert sandbox.check_expression("x * eval") == ["禁止访问名称: eval"]
+
+        class SecretChecker(SafetyChecker):
+            def visit_Name(self, node) -> None:
+                if node.id == "secret":
+                    self.errors.append("secret")
+                super().visit_Name(node)
+
+        # 子类覆盖的 visit_Name 不能被捷径跳过
+        assert SecretChecker().check("secret + 1") == ["secret"]
+        assert SecretChecker().check("secret") == ["secret"]
+
+    def test_check_follows_config_changes(self):
+        """Test the checker picks up config changes made after creation."""
+        config = SandboxConfig()
+        sandbox = Sandbox(config)
+
+        assert sandbox.check_expression("a + foo(bar) * 2") == []
+        assert sandbox.check_expression("a + obj._x * 2") == []
+        assert sandbox.check_expression("a + (1") != []
+
+        config.forbidden_names.add("foo")
+        config.strict_private_access = True
+        assert "禁止调用函数: foo" in sandbox.check_expression("a + foo(bar) * 2")
+        assert sandbox.check_expression("a + obj._x * 2") == ["禁止访问私有属性: _x"]
+
+    def test_normalized_identifiers_checked(self):
+        """Test identifiers that only match forbidden names after NFKC normalization."""
+        sandbox = Sandbox()
+
+        # 全角字母与 "︳" 在解析时被规范化为 eval 与下划线
+        assert sandbox.check_expression('ｅval("1+1")') == [
+            "禁止调用函数: eval",
+            "禁止访问名称: eval",
+        ]
+        assert sandbox.check_expression("x._︳class_︳") == ["禁止访问魔术属性: __class__"]
+        assert not sandbox.is_safe("x._︳class_︳")
+
     def test_private_attribute_access(self):
         """Test private attribute access."""
         # Strict mode
@@ -0,0 +1,108 @@
+"""
+Tests for maintenance scripts.
+"""
+
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent / "scripts"
+
+
+def load_script(name: str):
+    """Load a script module from the scripts directory."""
+    spec = importlib.util.spec_from_file_location(name, SCRIPTS_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope="module")
+def bump_version():
+    """Load scripts/bump_version.py."""
+    return load_script("bump_version")
+
+
+class TestBumpVersion:
+    """Test bump_version script helpers."""
+
+    def test_parse_version(self, bump_version):
+        """Test parsing plain and suffixed versions."""
+        assert bump_version.parse_version("1.2.3") == (1, 2, 3)
+        assert bump_version.parse_version("1.2.3-dev") == (1, 2, 3)
+        assert bump_version.parse_version("1.2.3+build.5") == (1, 2, 3)
+
+    def test_parse_prerelease_version(self, bump_version):
+        """Test pre-release suffixes directly after the patch number are ignored."""
+        assert bump_version.parse_version("1.2.3rc1") == (1, 2, 3)
+        assert bump_version.parse_version("1.2.3b2") == (1, 2, 3)
+        assert bump_version.bump_version("1.2.3rc1", "patch") == "1.2.4"
+
+    def test_parse_invalid_version(self, bump_version):
+        """Test malformed versions are rejected."""
+        for version in ["1.2", "a.b.c", "1.2.x", "1..3"]:
+            with pytest.raises(ValueError):
+                bump_version.parse_version(version)
+
+    def test_write_atomic(self, bump_version, tmp_path):
+        """Test atomic writes replace content, keep permissions and leave no temp files."""
+        path = tmp_path / "_version.py"
+        path.write_text('__version__ = "1.0.0"\n', encoding="utf-8")
+        path.chmod(0o644)
+
+        bump_version.write_atomic(path, '__version__ = "1.0.1"\n')
+        assert path.read_text(encoding="utf-8") == '__version__ = "1.0.1"\n'
+        assert path.stat().st_mode & 0o777 == 0o644
+        assert [p.name for p in tmp_path.iterdir()] == ["_version.py"]
+
+
+@pytest.fixture(scope="module")
+def check_license_headers():
+    """Load scripts/check_license_headers.py."""
+    return load_script("check_license_headers")
+
+
+class TestCheckLicenseHeaders:
+    """Test check_license_headers script helpers."""
+
+    def test_header_within_scan_limit(self, check_license_headers, tmp_path):
+        """Test a complete header at the top of the file passes in strict mode."""
+        path = tmp_path / "module.py"
+        path.write_text(
+            "# Copyright (c) 2024-2026 广东轻亿云软件科技有限公司\n"
+            "# AGPL-3.0 License - 商业用途需购买许可\n"
+            "x = 1\n",
+            encoding="utf-8",
+        )
+        assert check_license_headers.check_license_header(path, strict=True) == (True, "OK")
+
+    def test_header_beyond_scan_limit(self, check_license_headers, tmp_path):
+        """Test markers after the first 1000 characters are not accepted."""
+        path = tmp_path / "module.py"
+        path.write_text("x = 1\n" * 200 + "# Copyright qeasy\n", encoding="utf-8")
+        assert check_license_headers.check_license_header(path) == (False, "缺少 Copyright 声明")
+
+    def test_strict_mode_reasons(self, check_license_headers, tmp_path):
+        """Test strict mode reports which notice is missing and accepts either marker."""
+        path = tmp_path / "module.py"
+        header = "# Copyright (c) 2024-2026 广东轻亿云软件科技有限公司\n"
+
+        path.write_text(header, encoding="utf-8")
+        assert check_license_headers.check_license_header(path) == (True, "OK")
+        assert check_license_headers.check_license_header(path, strict=True) == (
+            False,
+            "缺少 AGPL-3.0 许可声明",
+        )
+
+        path.write_text(header + "# GNU Affero General Public License\n", encoding="utf-8")
+        assert check_license_headers.check_license_header(path, strict=True) == (
+            False,
+            "缺少商业许可提示",
+        )
+
+        path.write_text(
+            header + "# GNU Affero General Public License\n# See COMMERCIAL-LICENSE.txt\n",
+            encoding="utf-8",
+        )
+        assert check_license_headers.check_license_header(path, strict=True) == (True, "OK")
@@ -335,6 +335,61 @@ class TestJinja2TemplateEngine:
         except ImportError:
             pytest.skip("Jinja2 not available")
 
+    def test_jinja2_compiled_template_cache(self):
+        """Test compiled templates are reused and refreshed on filter changes."""
+        try:
+            from qdata_expr.template import Jinja2TemplateEngine
+
+            engine = Jinja2TemplateEngine()
+            template = "{% for item in items %}{{ item | shout }}{% endfor %}"
+
+            engine.register_filter("shout", lambda v: str(v).upper())
+            assert engine.render(template, {"items": ["a", "b"]}) == "AB"
+            assert engine.render(template, {"items": ["c"]}) == "C"
+            assert engine._compile.cache_info().hits == 1
+
+            engine.register_filter("shout", lambda v: f"{v}!")
+            assert engine.render(template, {"items": ["a"]}) == "a!"
+
+            with pytest.raises(TemplateParseError):
+                engine.render("{% if %}")
+        except ImportError:
+            pytest.skip("Jinja2 not available")
+
+    def test_jinja2_parse_cache_shared(self):
+        """Test validate/get_variables parse once and never compile."""
+        try:
+            from qdata_expr.template import Jinja2TemplateEngine
+
+            engine = Jinja2TemplateEngine()
+            template = "{% if a %}{{ b }}{% endif %}"
+
+            assert engine.validate(template) == []
+            assert engine.get_variables(template) == ["a", "b"]
+            assert engine._parse.cache_info().misses == 1
+            assert engine._compile.cache_info().currsize == 0
+
+            assert engine.render(template, {"a": True, "b": 1}) == "1"
+            assert engine._parse.cache_info().misses == 1
+        except ImportError:
+            pytest.skip("Jinja2 not available")
+
+    def test_jinja2_dict_attribute_lookup(self):
+        """Test dict rows resolve keys directly while dict methods keep priority."""
+        try:
+            from qdata_expr.template import Jinja2TemplateEngine
+
+            engine = Jinja2TemplateEngine()
+            rows = [{"name": "a", "price": 2, "qty": 3}, {"name": "b", "price": 1, "qty": 4}]
+            template = "{% for r in rows %}{{ r.name }}={{ r.price * r.qty }};{% endfor %}"
+            assert engine.render(template, {"rows": rows}) == "a=6;b=4;"
+
+            data = {"items": "shadowed", "x": 1}
+            template = "{% for k, v in data.items() %}{{ k }}{% endfor %}|{{ data.missing }}"
+            assert engine.render(template, {"data": data}) == "itemsx|"
+        except ImportError:
+            pytest.skip("Jinja2 not available")
+
 
 class TestSimpleTemplateEngine:
     """Test SimpleTemplateEngine class."""